@@ -1,5 +1,7 @@
 import random
 
+from algorithms.sort import nth_element
+
 
 # [50] https://leetcode.com/problems/powx-n
 # Implement pow(x, n), which calculates x raised to the power n
@@ -106,6 +108,12 @@ def kClosest(points, K):
     return points[:K]
 
 
+# the same with the reusable introselect from sort.py
+def kClosest2(points, K):
+    nth_element(points, K - 1, key=lambda p: p[0] ** 2 + p[1] ** 2)
+    return points[:K]
+
+
 # [4] https://leetcode.com/problems/median-of-two-sorted-arrays/
 # Find the median of the two sorted arrays
 def medianSortedArrays(a, b):
@@ -3,20 +3,36 @@
 # Common representations:
 # - Adjacency list: A dictionary where each node maps to a list of its neighbors.
 # - Adjacency matrix: A 2D array where cell (i, j) represents an edge between nodes i and j.
+# - Compressed sparse row (CSR): node ids 0..n-1, an offsets array and flat target/weight arrays.
+#   The out-edges of node i are targets[offsets[i]:offsets[i + 1]]. Read-only, but ~8 bytes per
+#   edge instead of a Python tuple per edge, and neighbor scans walk contiguous memory.
 #
 # Common algorithms:
 # - Depth-First Search (DFS)
-# - Breadth-First Search (BFS)
+# - Breadth-First Search (BFS), direction-optimizing (top-down / bottom-up) BFS
 # - Dijkstra's algorithm (shortest path)
-# - Kruskal's algorithm (minimum spanning tree)
+# - Bidirectional Dijkstra and A* (point-to-point shortest path)
+# - Tarjan's algorithm (strongly connected components, condensation DAG)
+# - Kruskal's and Prim's algorithms (minimum spanning tree), incremental MST under edge insertions
 
+from array import array
 from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from multiprocessing import shared_memory
+import json
+import mmap
+import os
+import struct
+from itertools import repeat
 import heapq
 from typing import List, Tuple
 
+from data_structures.heap import IndexedHeap, RadixHeap
+
 class Graph:
     def __init__(self):
         self.graph = defaultdict(list)
+        self._frozen = None
 
     def add_edge(self, u, v, weight=None):
         """
@@ -27,6 +43,17 @@ class Graph:
             self.graph[u].append((v, weight))
         else:
             self.graph[u].append(v)
+        self._frozen = None
+
+    def freeze(self):
+        """
+        Build the read-only CSR form of the current graph (see CSRGraph).
+        The result is cached until the next add_edge call.
+        Time Complexity: O(V + E)
+        """
+        if self._frozen is None:
+            self._frozen = CSRGraph.from_adjacency(self.graph)
+        return self._frozen
 
     # ====================== Depth-First Search (DFS) ======================
     def dfs(self, start):
@@ -49,26 +76,43 @@ class Graph:
     def bfs(self, start):
         """
         Perform Breadth-First Search (BFS) starting from the given node.
+        Nodes are marked visited when enqueued, so each one enters the queue once.
         Returns a set of visited nodes.
         Time Complexity: O(V + E)
         """
-        visited = set()
+        visited = {start}
         queue = deque([start])
         while queue:
             node = queue.popleft()
-            if node not in visited:
-                visited.add(node)
-                for neighbor in self.graph[node]:
-                    queue.append(neighbor[0] if isinstance(neighbor, tuple) else neighbor)
+            for neighbor in self.graph[node]:
+                neighbor = neighbor[0] if isinstance(neighbor, tuple) else neighbor
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    queue.append(neighbor)
         return visited
 
+    def bfs_levels(self, start):
+        """
+        Level of every node reachable from start (start is level 0), using the
+        direction-optimizing BFS on the frozen CSR form (see CSRGraph.bfs_levels).
+        Returns a dictionary of node -> level.
+        """
+        csr = self.freeze()
+        if start not in csr.index:
+            return {start: 0}
+        return {csr.nodes[i]: level for i, level in enumerate(csr.bfs_levels(start)) if level >= 0}
+
     # ====================== Dijkstra's Algorithm ======================
-    def dijkstra(self, start):
+    def dijkstra(self, start, mode='lazy'):
         """
         Find the shortest path from the start node to all other nodes using Dijkstra's algorithm.
         Returns a dictionary of shortest distances.
+        Any other mode ('indexed', 'dial', 'radix', 'auto') runs on the frozen CSR form
+        (see CSRGraph.dijkstra).
         Time Complexity: O((V + E) log V) with a priority queue.
         """
+        if mode != 'lazy':
+            return self.freeze().dijkstra(start, mode)
         distances = {node: float('inf') for node in self.graph}
         distances[start] = 0
         priority_queue = [(0, start)]
@@ -88,6 +132,22 @@ class Graph:
         
         return distances
 
+    def multi_source_dijkstra(self, sources, max_workers=None, batch_size=16, mode='lazy'):
+        """
+        Run Dijkstra from every source in parallel worker processes on the frozen CSR form.
+        Yields (source, row) as results complete (see CSRGraph.multi_source_dijkstra).
+        """
+        return self.freeze().multi_source_dijkstra(sources, max_workers, batch_size, mode)
+
+    # ====================== Point-to-Point Shortest Path ======================
+    def shortest_path(self, source, target, method='dijkstra', heuristic=None):
+        """
+        Find the shortest path from source to target only, on the frozen CSR form.
+        method is 'dijkstra', 'bidirectional' or 'astar' (see CSRGraph.shortest_path).
+        Returns (distance, path), or (inf, []) if target is unreachable.
+        """
+        return self.freeze().shortest_path(source, target, method, heuristic)
+
     # ====================== Kruskal's Algorithm ======================
     def kruskal(self):
         """
@@ -95,27 +155,29 @@ class Graph:
         Returns a list of edges in the MST.
         Time Complexity: O(E log E) due to sorting.
         """
-        parent = {}
+        parent, rank = {}, {}
         def find(node):
             """
             Find the root of the set containing the given node.
+            Iterative with path halving, so long chains cannot hit the recursion limit.
             """
-            if parent[node] != node:
-                parent[node] = find(parent[node])
-            return parent[node]
+            parent.setdefault(node, node)
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
         
         def union(u, v):
             """
-            Union the sets containing u and v.
+            Union the sets containing u and v, by rank.
             """
             root_u = find(u)
             root_v = find(v)
             if root_u != root_v:
+                if rank.get(root_u, 0) < rank.get(root_v, 0):
+                    root_u, root_v = root_v, root_u
                 parent[root_v] = root_u
-        
-        # Initialize parent pointers
-        for node in self.graph:
-            parent[node] = node
+                rank[root_u] = rank.get(root_u, 0) + (rank.get(root_u, 0) == rank.get(root_v, 0))
         
         # Extract all edges and sort by weight
         edges = []
@@ -131,3 +193,1205 @@ class Graph:
                 mst.append((u, v, weight))
         
         return mst
+
+    # ====================== Prim's Algorithm ======================
+    def prim(self):
+        """
+        Find the Minimum Spanning Tree (MST) with Prim's algorithm on the frozen CSR form.
+        No edge sort, see CSRGraph.prim.
+        Returns a list of edges in the MST.
+        """
+        return self.freeze().prim()
+
+    # ====================== Strongly Connected Components ======================
+    def strongly_connected_components(self):
+        """
+        Find the strongly connected components with an iterative Tarjan on the frozen CSR form.
+        Returns a list of components (lists of nodes) in topological order of the condensation:
+        every edge between two components goes from an earlier one to a later one.
+        Time Complexity: O(V + E)
+        """
+        csr = self.freeze()
+        component, count = csr.strongly_connected_components()
+        components = [[] for _ in range(count)]
+        for i, c in enumerate(component):
+            components[c].append(csr.nodes[i])
+        return components
+
+
+def _typecode(a):
+    """
+    Element type of an array, or of a memoryview over one (shared memory, mmap).
+    """
+    return a.typecode if isinstance(a, array) else a.format
+
+
+def _append_weight(weights, weight):
+    """
+    Append weight to an array of edge weights and return the array, switched to a wider storage
+    if needed: a non-int weight turns int64 into float64, an int beyond int64 turns it into a list
+    of exact Python ints. Shared by the CSRGraph loaders.
+    """
+    try:
+        weights.append(weight)
+    except TypeError:
+        weights = array('d', weights)
+        weights.append(weight)
+    except OverflowError:
+        weights = list(weights)
+        weights.append(weight)
+    return weights
+
+
+def _zero_weights(weights, size):
+    """
+    size zero weights of the same storage as weights: a list for the int weights beyond int64
+    that from_adjacency / from_edge_list keep as a plain list, an array of the same typecode otherwise.
+    """
+    if isinstance(weights, list):
+        return [0] * size
+    return array(_typecode(weights), [0]) * size
+
+
+# binary CSR file: header, offsets (n + 1 int64), targets (m int64), weights (m int64/float64),
+# then node labels as a JSON list (omitted when labels are 0..n-1). Native byte order.
+CSR_MAGIC = b'CSRG'
+CSR_HEADER = struct.Struct('<4sBcxxqqq')  # magic, version, weight typecode or b'-', n, m, labels size
+
+
+# dijkstra mode='auto' uses Dial's buckets up to this max integer weight, heapq above it.
+# the radix heap beats heapq only narrowly on random graphs and loses on grids, heapq runs in C
+DIAL_MAX_WEIGHT = 1000
+
+# unreachable nodes in the array('q') distance rows of multi_source_dijkstra, which have no inf
+UNREACHABLE = (1 << 63) - 1
+
+
+class CSRGraph:
+    """
+    Frozen compressed sparse row (CSR) form of a Graph, built by Graph.freeze().
+    Nodes are renumbered 0..n-1: nodes[i] is the label of id i and index[label] is its id.
+    The out-edges of id u are targets[offsets[u]:offsets[u + 1]], with matching entries in weights.
+    weights is an array of int64 ('q') when every weight is an int, float64 ('d') otherwise,
+    a plain list when an int weight does not fit in int64, and None for an unweighted graph,
+    in which case every edge counts as weight 1.
+    dfs, bfs, dijkstra and kruskal take and return node labels, same as Graph.
+    """
+
+    def __init__(self, nodes, offsets, targets, weights=None, index=None):
+        self.nodes = nodes
+        self.index = {node: i for i, node in enumerate(nodes)} if index is None else index
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self._reverse = None
+        self._int_weights = None
+
+    @classmethod
+    def from_adjacency(cls, adjacency):
+        """
+        Build a CSRGraph from a dict of lists, where each entry is either v or (v, weight).
+        Time Complexity: O(V + E)
+        """
+        nodes = list(adjacency)
+        index = {node: i for i, node in enumerate(nodes)}
+        offsets, targets = array('q', [0]), array('q')
+        weights = None
+        for u in list(adjacency):
+            for edge in adjacency[u]:
+                v, weight = edge if isinstance(edge, tuple) else (edge, None)
+                if v not in index:
+                    index[v] = len(nodes)
+                    nodes.append(v)
+                if weight is not None and weights is None:
+                    # first weighted edge: earlier plain edges count as weight 1
+                    weights = array('q', [1]) * len(targets)
+                if weights is not None:
+                    weights = _append_weight(weights, 1 if weight is None else weight)
+                targets.append(index[v])
+            offsets.append(len(targets))
+        # nodes only seen as targets have no out-edges
+        offsets.extend(repeat(len(targets), len(nodes) + 1 - len(offsets)))
+        return cls(nodes, offsets, targets, weights)
+
+    @classmethod
+    def from_edge_list(cls, path, nodetype=int):
+        """
+        Stream a text edge list, one "u v" or "u v weight" per line ('#' starts a comment),
+        straight into arrays without building a Graph. nodetype converts labels, None keeps str.
+        Edges are then bucketed by source with a counting sort, keeping file order per source.
+        Time Complexity: O(V + E)
+        """
+        nodes, index = [], {}
+        sources, targets, weights = array('q'), array('q'), None
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                if not parts or parts[0].startswith('#'):
+                    continue
+                ids = []
+                for label in parts[:2]:
+                    if nodetype is not None:
+                        label = nodetype(label)
+                    if label not in index:
+                        index[label] = len(nodes)
+                        nodes.append(label)
+                    ids.append(index[label])
+                sources.append(ids[0])
+                targets.append(ids[1])
+                if len(parts) > 2 and weights is None:
+                    weights = array('q', [1]) * (len(targets) - 1)
+                if weights is not None:
+                    weight = parts[2] if len(parts) > 2 else '1'
+                    try:
+                        weight = int(weight)
+                    except ValueError:
+                        weight = float(weight)
+                    weights = _append_weight(weights, weight)
+
+        n, m = len(nodes), len(targets)
+        offsets = array('q', [0]) * (n + 1)
+        for u in sources:
+            offsets[u + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+        slot = offsets[:-1]
+        csr_targets = array('q', [0]) * m
+        csr_weights = None if weights is None else _zero_weights(weights, m)
+        for e in range(m):
+            u = sources[e]
+            csr_targets[slot[u]] = targets[e]
+            if weights is not None:
+                csr_weights[slot[u]] = weights[e]
+            slot[u] += 1
+        return cls(nodes, offsets, csr_targets, csr_weights, index)
+
+    def to_edge_list(self, path):
+        """
+        Write the graph as a text edge list readable by from_edge_list.
+        Time Complexity: O(V + E)
+        """
+        nodes, offsets, targets, weights = self.nodes, self.offsets, self.targets, self.weights
+        with open(path, 'w') as f:
+            for u in range(len(nodes)):
+                for e in range(offsets[u], offsets[u + 1]):
+                    if weights is None:
+                        f.write('{} {}\n'.format(nodes[u], nodes[targets[e]]))
+                    else:
+                        f.write('{} {} {!r}\n'.format(nodes[u], nodes[targets[e]], weights[e]))
+
+    def save(self, path):
+        """
+        Write the compact binary form (see CSR_HEADER): the arrays are dumped as raw bytes,
+        labels as JSON, so they must be ints or strs. Labels 0..n-1 are not stored at all.
+        Time Complexity: O(V + E)
+        """
+        n, m = len(self.nodes), len(self.targets)
+        if isinstance(self.weights, list):
+            raise ValueError("int weights beyond int64 cannot be saved")
+        labels = b''
+        if not all(isinstance(node, int) and node == i for i, node in enumerate(self.nodes)):
+            if not all(isinstance(node, (int, str)) for node in self.nodes):
+                raise ValueError("only int or str node labels can be saved")
+            labels = json.dumps(list(self.nodes)).encode()
+        typecode = b'-' if self.weights is None else _typecode(self.weights).encode()
+        with open(path, 'wb') as f:
+            f.write(CSR_HEADER.pack(CSR_MAGIC, 1, typecode, n, m, len(labels)))
+            for a in (self.offsets, self.targets, self.weights):
+                if a is not None:
+                    f.write(memoryview(a).cast('B'))
+            f.write(labels)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Memory-map a file written by save. offsets/targets/weights become read-only memoryviews
+        over the mapping, so nothing is copied or parsed; pages are read on first touch.
+        Time Complexity: O(1) for the arrays, O(V) for non-default labels
+        """
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, typecode, n, m, labels_size = CSR_HEADER.unpack_from(mapped)
+        if magic != CSR_MAGIC or version != 1:
+            raise ValueError("{} is not a CSR graph file".format(path))
+        view, at = memoryview(mapped), CSR_HEADER.size
+
+        def take(count, code):
+            nonlocal at
+            size = count * 8
+            a = view[at:at + size].cast(code)
+            at += size
+            return a
+
+        offsets, targets = take(n + 1, 'q'), take(m, 'q')
+        weights = None if typecode == b'-' else take(m, typecode.decode())
+        if labels_size:
+            nodes = json.loads(bytes(view[at:at + labels_size]))
+            return cls(nodes, offsets, targets, weights)
+        # labels are the ids themselves
+        return cls(range(n), offsets, targets, weights, range(n))
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def reverse(self):
+        """
+        The transposed graph (every edge u -> v becomes v -> u), sharing node ids with this one.
+        Built once by a counting sort on targets and cached.
+        Time Complexity: O(V + E)
+        """
+        if self._reverse is None:
+            n, offsets, targets, weights = len(self.nodes), self.offsets, self.targets, self.weights
+            rev_offsets = array('q', [0]) * (n + 1)
+            for v in targets:
+                rev_offsets[v + 1] += 1
+            for i in range(n):
+                rev_offsets[i + 1] += rev_offsets[i]
+            rev_targets = array('q', [0]) * len(targets)
+            rev_weights = None if weights is None else _zero_weights(weights, len(targets))
+            slot = rev_offsets[:-1]
+            for u in range(n):
+                for e in range(offsets[u], offsets[u + 1]):
+                    v = targets[e]
+                    rev_targets[slot[v]] = u
+                    if weights is not None:
+                        rev_weights[slot[v]] = weights[e]
+                    slot[v] += 1
+            self._reverse = CSRGraph(self.nodes, rev_offsets, rev_targets, rev_weights, self.index)
+            self._reverse._reverse = self
+        return self._reverse
+
+    def _edge_weights(self, lo, hi):
+        """
+        Weights of the edges in slots [lo, hi), all 1 for an unweighted graph.
+        """
+        if self.weights is None:
+            return repeat(1, hi - lo)
+        return self.weights[lo:hi]
+
+    def _labels(self, seen):
+        nodes = self.nodes
+        return {nodes[i] for i, flag in enumerate(seen) if flag}
+
+    def dfs(self, start):
+        """
+        Depth-First Search over node ids with a bytearray visited set.
+        Returns a set of visited nodes.
+        Time Complexity: O(V + E)
+        """
+        if start not in self.index:
+            return {start}
+        offsets, targets = self.offsets, self.targets
+        seen = bytearray(len(self.nodes))
+        s = self.index[start]
+        seen[s] = 1
+        stack = [s]
+        while stack:
+            u = stack.pop()
+            for v in targets[offsets[u]:offsets[u + 1]]:
+                if not seen[v]:
+                    seen[v] = 1
+                    stack.append(v)
+        return self._labels(seen)
+
+    def bfs(self, start):
+        """
+        Breadth-First Search over node ids, marking nodes when they are enqueued.
+        Returns a set of visited nodes.
+        Time Complexity: O(V + E)
+        """
+        if start not in self.index:
+            return {start}
+        offsets, targets = self.offsets, self.targets
+        seen = bytearray(len(self.nodes))
+        s = self.index[start]
+        seen[s] = 1
+        queue = deque([s])
+        while queue:
+            u = queue.popleft()
+            for v in targets[offsets[u]:offsets[u + 1]]:
+                if not seen[v]:
+                    seen[v] = 1
+                    queue.append(v)
+        return self._labels(seen)
+
+    def bfs_levels(self, start, alpha=14, beta=24):
+        """
+        Level-synchronous, direction-optimizing BFS (Beamer et al.).
+        Top-down steps scan the out-edges of the frontier. When the frontier's edges exceed
+        1/alpha of the edges left unexplored, bottom-up steps take over: every unvisited node
+        scans its in-edges (the reversed graph) and stops at the first parent found in the
+        frontier bytearray, which skips most edges once the frontier is huge. It switches back
+        to top-down when the frontier shrinks below V / beta nodes. alpha=0 means top-down only.
+        Returns an array('q') indexed by node id: the level, or -1 if unreachable.
+        Time Complexity: O(V + E)
+        """
+        n, offsets, targets = len(self.nodes), self.offsets, self.targets
+        level = array('q', [-1]) * n
+        if start not in self.index:
+            return level
+        s = self.index[start]
+        level[s] = 0
+        frontier, depth, bottom_up, unvisited = [s], 0, False, None
+        edges_unexplored = len(targets) - (offsets[s + 1] - offsets[s])
+        while frontier:
+            edges_frontier = sum(offsets[u + 1] - offsets[u] for u in frontier)
+            if not bottom_up and edges_frontier * alpha > edges_unexplored:
+                bottom_up = True
+            elif bottom_up and len(frontier) * beta < n:
+                bottom_up = False
+            depth += 1
+            next_frontier = []
+            if bottom_up:
+                reverse = self.reverse()
+                rev_offsets, rev_targets = reverse.offsets, reverse.targets
+                in_frontier = bytearray(n)
+                for u in frontier:
+                    in_frontier[u] = 1
+                unvisited = [v for v in (range(n) if unvisited is None else unvisited) if level[v] < 0]
+                for v in unvisited:
+                    for u in rev_targets[rev_offsets[v]:rev_offsets[v + 1]]:
+                        if in_frontier[u]:
+                            level[v] = depth
+                            next_frontier.append(v)
+                            break
+            else:
+                for u in frontier:
+                    for v in targets[offsets[u]:offsets[u + 1]]:
+                        if level[v] < 0:
+                            level[v] = depth
+                            next_frontier.append(v)
+            edges_unexplored -= sum(offsets[v + 1] - offsets[v] for v in next_frontier)
+            frontier = next_frontier
+        return level
+
+    def dijkstra(self, start, mode='lazy'):
+        """
+        Dijkstra's algorithm over node ids, distances kept in a flat list.
+        mode: 'lazy' pushes duplicate (distance, node) entries and skips stale ones, so the heap
+        can grow to O(E); 'indexed' uses decrease-key so the heap stays at O(V).
+        For non-negative integer weights: 'dial' uses a ring of max_weight + 1 buckets, O(E + V * C),
+        and 'radix' a radix heap, O(E + V log(V * C)). 'auto' picks 'dial' for small integer
+        weights and 'lazy' otherwise.
+        Returns a dictionary of shortest distances for every node (inf if unreachable).
+        Time Complexity: O((V + E) log V)
+        """
+        mode = self._resolve_mode(mode)
+        if start not in self.index:
+            return dict.fromkeys(self.nodes, float('inf'))
+        return dict(zip(self.nodes, self._distances(self.index[start], mode)))
+
+    def _weight_range(self):
+        """
+        (min, max) edge weight if all weights are ints, else None. Cached.
+        """
+        if self._int_weights is None:
+            weights = self.weights
+            if weights is None:
+                self._int_weights = (1, 1)
+            elif isinstance(weights, list):
+                # ints beyond int64, maybe mixed with floats
+                ints = all(isinstance(w, int) for w in weights)
+                self._int_weights = ints and (min(weights), max(weights))
+            elif _typecode(weights) == 'q':
+                self._int_weights = (min(weights), max(weights)) if len(weights) else (0, 0)
+            else:
+                self._int_weights = False
+        return self._int_weights or None
+
+    def _resolve_mode(self, mode):
+        """
+        Validate a dijkstra mode and turn 'auto' into a concrete one:
+        non-negative int weights up to DIAL_MAX_WEIGHT -> 'dial', else 'lazy'.
+        """
+        if mode not in ('auto', 'lazy', 'indexed', 'radix', 'dial'):
+            raise ValueError("unknown dijkstra mode: {!r}".format(mode))
+        weight_range = self._weight_range()
+        if mode in ('radix', 'dial') and (weight_range is None or weight_range[0] < 0):
+            raise ValueError("{} mode needs non-negative integer weights".format(mode))
+        if mode != 'auto':
+            return mode
+        if weight_range is None or weight_range[0] < 0:
+            return 'lazy'
+        return 'dial' if weight_range[1] <= DIAL_MAX_WEIGHT else 'lazy'
+
+    def _distance_row(self, dist):
+        """
+        Pack a _distances list for multi_source_dijkstra: array('d') for float weights, else
+        array('q') with UNREACHABLE for inf, or the list itself when it does not fit int64.
+        """
+        if self._weight_range() is None:
+            return array('d', dist)
+        if isinstance(self.weights, list):
+            return dist
+        inf = float('inf')
+        try:
+            return array('q', [UNREACHABLE if d == inf else d for d in dist])
+        except OverflowError:
+            return dist
+
+    def _distances(self, s, mode):
+        """
+        Shortest distances from id s as a list indexed by node id, mode already resolved.
+        """
+        if mode == 'lazy':
+            return self._dijkstra_lazy(s)
+        if mode == 'indexed':
+            return self._dijkstra_indexed(s)
+        if mode == 'dial':
+            return self._dijkstra_dial(s)
+        return self._dijkstra_radix(s)
+
+    def _dijkstra_lazy(self, s):
+        offsets, targets = self.offsets, self.targets
+        dist = [float('inf')] * len(self.nodes)
+        dist[s] = 0
+        priority_queue = [(0, s)]
+        while priority_queue:
+            d, u = heapq.heappop(priority_queue)
+            if d > dist[u]:
+                continue
+            lo, hi = offsets[u], offsets[u + 1]
+            for v, weight in zip(targets[lo:hi], self._edge_weights(lo, hi)):
+                nd = d + weight
+                if nd < dist[v]:
+                    dist[v] = nd
+                    heapq.heappush(priority_queue, (nd, v))
+        return dist
+
+    def _dijkstra_indexed(self, s):
+        """
+        Decrease-key Dijkstra on an IndexedHeap, each node is in the heap at most once.
+        """
+        offsets, targets, n = self.offsets, self.targets, len(self.nodes)
+        dist = [float('inf')] * n
+        dist[s] = 0
+        heap = IndexedHeap()
+        heap.push(s, 0)
+        while heap:
+            u, d = heap.pop()
+            lo, hi = offsets[u], offsets[u + 1]
+            for v, weight in zip(targets[lo:hi], self._edge_weights(lo, hi)):
+                nd = d + weight
+                if nd < dist[v]:
+                    dist[v] = nd
+                    # insert or decrease-key
+                    heap.push(v, nd)
+        return dist
+
+    def _dijkstra_dial(self, s):
+        """
+        Dial's algorithm: with integer weights in [0, C], every queued distance lies in
+        [d, d + C] for the current distance d, so C + 1 buckets used as a ring replace the heap.
+        """
+        offsets, targets, n = self.offsets, self.targets, len(self.nodes)
+        size = self._weight_range()[1] + 1
+        buckets = [[] for _ in range(size)]
+        dist = [float('inf')] * n
+        dist[s] = 0
+        buckets[0].append(s)
+        queued, d = 1, 0
+        while queued:
+            bucket = buckets[d % size]
+            # zero-weight edges may refill the current bucket while it is drained
+            while bucket:
+                u = bucket.pop()
+                queued -= 1
+                if dist[u] != d:
+                    continue
+                lo, hi = offsets[u], offsets[u + 1]
+                for v, weight in zip(targets[lo:hi], self._edge_weights(lo, hi)):
+                    nd = d + weight
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        buckets[nd % size].append(v)
+                        queued += 1
+            d += 1
+        return dist
+
+    def _dijkstra_radix(self, s):
+        """
+        Lazy Dijkstra on a RadixHeap: popped distances never decrease, so a push is O(1)
+        and each distance moves to a lower bucket at most log(max distance) times.
+        """
+        offsets, targets, n = self.offsets, self.targets, len(self.nodes)
+        dist = [float('inf')] * n
+        dist[s] = 0
+        heap = RadixHeap()
+        heap.push(0, s)
+        while heap:
+            d, u = heap.pop()
+            if d != dist[u]:
+                continue
+            lo, hi = offsets[u], offsets[u + 1]
+            for v, weight in zip(targets[lo:hi], self._edge_weights(lo, hi)):
+                nd = d + weight
+                if nd < dist[v]:
+                    dist[v] = nd
+                    heap.push(nd, v)
+        return dist
+
+    def multi_source_dijkstra(self, sources, max_workers=None, batch_size=16, mode='lazy'):
+        """
+        Dijkstra from many sources, fanned out over a ProcessPoolExecutor.
+        The offsets/targets/weights arrays are copied once into shared memory and every worker
+        maps them read-only, so the graph is not pickled per task. Sources are sent in batches
+        of batch_size, with a bounded number of batches in flight.
+        Yields (source, row) in completion order, where row is indexed by node id:
+        row[index[v]] is the distance from source to v. Sources not in the graph are skipped.
+        Integer distances stay exact (see _distance_row): row is an array('q') with UNREACHABLE
+        for unreachable nodes, or a plain list with inf once a distance or weight is beyond int64.
+        With float weights row is an array('d') with inf.
+        Time Complexity: O(S (V + E) log V / workers) for S sources
+        """
+        mode = self._resolve_mode(mode)
+        ids = [self.index[source] for source in sources if source in self.index]
+        arrays = [self.offsets, self.targets]
+        plain_weights = self.weights if isinstance(self.weights, list) else None
+        if self.weights is not None and plain_weights is None:
+            arrays.append(self.weights)
+        blocks, executor = [], None
+        try:
+            for a in arrays:
+                nbytes = len(a) * a.itemsize
+                block = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+                block.buf[:nbytes] = memoryview(a).cast('B')
+                blocks.append(block)
+            layout = [(block.name, _typecode(a), len(a)) for block, a in zip(blocks, arrays)]
+            # a plain list of weights (ints beyond int64) is pickled once per worker instead
+            executor = ProcessPoolExecutor(max_workers, initializer=_attach_shared_graph,
+                                           initargs=(layout, mode, plain_weights))
+            window = 4 * (max_workers or os.cpu_count() or 1)
+            pending = set()
+            for i in range(0, len(ids), batch_size):
+                pending.add(executor.submit(_shared_distance_rows, ids[i:i + batch_size]))
+                if len(pending) < window:
+                    continue
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for s, row in future.result():
+                        yield self.nodes[s], row
+            for future in as_completed(pending):
+                for s, row in future.result():
+                    yield self.nodes[s], row
+        finally:
+            # also reached when the caller stops iterating early
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    def shortest_path(self, source, target, method='dijkstra', heuristic=None):
+        """
+        Shortest path between two nodes, stopping as soon as the target is settled.
+        method: 'dijkstra' (early termination), 'bidirectional' (searches from both ends over
+        the reversed graph) or 'astar' (heuristic(node, target) must never overestimate and
+        must be consistent, e.g. straight-line or Manhattan distance on a grid).
+        State is kept in dicts, so a query only pays for the nodes it touches.
+        Returns (distance, path), or (inf, []) if target is unreachable.
+        Time Complexity: O((V + E) log V) worst case, usually far less
+        """
+        if source == target:
+            return 0, [source]
+        if source not in self.index or target not in self.index:
+            return float('inf'), []
+        s, t = self.index[source], self.index[target]
+        if method == 'dijkstra':
+            return self._astar(s, t, None)
+        if method == 'astar':
+            return self._astar(s, t, heuristic)
+        if method == 'bidirectional':
+            return self._bidirectional(s, t)
+        raise ValueError("unknown shortest path method: {!r}".format(method))
+
+    def _path(self, parent, node):
+        """
+        Follow parent links from node back to the search root, returning ids root first.
+        """
+        path = []
+        while node != -1:
+            path.append(node)
+            node = parent[node]
+        path.reverse()
+        return path
+
+    def _astar(self, s, t, heuristic):
+        offsets, targets, nodes = self.offsets, self.targets, self.nodes
+        goal = nodes[t]
+        h = (lambda v: 0) if heuristic is None else (lambda v: heuristic(nodes[v], goal))
+        dist, parent = {s: 0}, {s: -1}
+        priority_queue = [(h(s), 0, s)]
+        while priority_queue:
+            _, d, u = heapq.heappop(priority_queue)
+            if u == t:
+                return d, [nodes[i] for i in self._path(parent, t)]
+            if d > dist[u]:
+                continue
+            lo, hi = offsets[u], offsets[u + 1]
+            for v, weight in zip(targets[lo:hi], self._edge_weights(lo, hi)):
+                nd = d + weight
+                if v not in dist or nd < dist[v]:
+                    dist[v] = nd
+                    parent[v] = u
+                    heapq.heappush(priority_queue, (nd + h(v), nd, v))
+        return float('inf'), []
+
+    def _bidirectional(self, s, t):
+        inf = float('inf')
+        sides = (self, self.reverse())
+        dist, parent = ({s: 0}, {t: 0}), ({s: -1}, {t: -1})
+        queues = ([(0, s)], [(0, t)])
+        best, meet = inf, -1
+        while queues[0] and queues[1]:
+            # no undiscovered path can beat best once the two frontiers are this far apart
+            if queues[0][0][0] + queues[1][0][0] >= best:
+                break
+            # grow the smaller frontier
+            side = 0 if len(queues[0]) <= len(queues[1]) else 1
+            d, u = heapq.heappop(queues[side])
+            if d > dist[side][u]:
+                continue
+            g, near, far = sides[side], dist[side], dist[1 - side]
+            lo, hi = g.offsets[u], g.offsets[u + 1]
+            for v, weight in zip(g.targets[lo:hi], g._edge_weights(lo, hi)):
+                nd = d + weight
+                if nd < near.get(v, inf):
+                    near[v] = nd
+                    parent[side][v] = u
+                    heapq.heappush(queues[side], (nd, v))
+                if v in far and near[v] + far[v] < best:
+                    best, meet = near[v] + far[v], v
+        if meet == -1:
+            return inf, []
+        path = self._path(parent[0], meet) + self._path(parent[1], meet)[::-1][1:]
+        return best, [self.nodes[i] for i in path]
+
+    def kruskal(self):
+        """
+        Kruskal's algorithm over edge slots, with an iterative array-backed union-find.
+        Returns a list of (u, v, weight) edges in the MST.
+        Time Complexity: O(E log E)
+        """
+        n, offsets, targets = len(self.nodes), self.offsets, self.targets
+        weights = self.weights if self.weights is not None else array('q', [1]) * len(targets)
+        sources = array('q')
+        for u in range(n):
+            sources.extend(repeat(u, offsets[u + 1] - offsets[u]))
+
+        parent, rank = array('q', range(n)), bytearray(n)
+
+        def find(x):
+            # path halving, no recursion
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        mst, nodes = [], self.nodes
+        for e in sorted(range(len(targets)), key=weights.__getitem__):
+            ru, rv = find(sources[e]), find(targets[e])
+            if ru != rv:
+                if rank[ru] < rank[rv]:
+                    ru, rv = rv, ru
+                parent[rv] = ru
+                rank[ru] += rank[ru] == rank[rv]
+                mst.append((nodes[sources[e]], nodes[targets[e]], weights[e]))
+                if len(mst) == n - 1:
+                    break
+        return mst
+
+    def prim(self):
+        """
+        Prim's algorithm with a decrease-key heap over node ids, growing one tree per component.
+        Edges are treated as undirected, like kruskal: a node's neighbors are its out-edges plus
+        its in-edges from the reversed graph. No edge sort, the heap holds at most V ids.
+        Returns a list of (u, v, weight) edges in the minimum spanning forest.
+        Time Complexity: O((V + E) log V)
+        """
+        n, nodes, inf = len(self.nodes), self.nodes, float('inf')
+        cost, via = [inf] * n, array('q', [-1]) * n
+        done = bytearray(n)
+        heap = IndexedHeap()
+        mst = []
+        for root in range(n):
+            if done[root]:
+                continue
+            cost[root] = 0
+            heap.push(root, 0)
+            while heap:
+                u, _ = heap.pop()
+                done[u] = 1
+                if via[u] != -1:
+                    mst.append((nodes[via[u]], nodes[u], cost[u]))
+                for g in (self, self.reverse()):
+                    lo, hi = g.offsets[u], g.offsets[u + 1]
+                    for v, weight in zip(g.targets[lo:hi], g._edge_weights(lo, hi)):
+                        if not done[v] and weight < cost[v]:
+                            cost[v] = weight
+                            via[v] = u
+                            heap.push(v, weight)
+        return mst
+
+    def strongly_connected_components(self):
+        """
+        Tarjan's algorithm without recursion: an explicit stack of node ids, with next_edge[u]
+        remembering where u's edge scan resumes, so millions of nodes never touch the call stack.
+        Components are numbered in topological order (Tarjan finishes them in reverse).
+        Returns (component, count): component is an array('q') mapping node id -> component id.
+        Time Complexity: O(V + E)
+        """
+        n, offsets, targets = len(self.nodes), self.offsets, self.targets
+        order, low = array('q', [-1]) * n, array('q', [0]) * n
+        next_edge = array('q', offsets[:-1]) if n else array('q')
+        component = array('q', [-1]) * n
+        on_stack, stack = bytearray(n), []
+        counter = count = 0
+        for root in range(n):
+            if order[root] != -1:
+                continue
+            order[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            work = [root]
+            while work:
+                u = work[-1]
+                e, end = next_edge[u], offsets[u + 1]
+                while e < end:
+                    v = targets[e]
+                    e += 1
+                    if order[v] == -1:
+                        # descend into v, resume u at edge e later
+                        next_edge[u] = e
+                        order[v] = low[v] = counter
+                        counter += 1
+                        stack.append(v)
+                        on_stack[v] = 1
+                        work.append(v)
+                        break
+                    if on_stack[v] and order[v] < low[u]:
+                        low[u] = order[v]
+                else:
+                    # all edges of u done
+                    work.pop()
+                    if low[u] == order[u]:
+                        while True:
+                            w = stack.pop()
+                            on_stack[w] = 0
+                            component[w] = count
+                            if w == u:
+                                break
+                        count += 1
+                    if work and low[u] < low[work[-1]]:
+                        low[work[-1]] = low[u]
+        for i in range(n):
+            component[i] = count - 1 - component[i]
+        return component, count
+
+    def condensation(self):
+        """
+        The condensation DAG: one node per strongly connected component (ids 0..k-1, in
+        topological order), one edge per pair of connected components, keeping the lightest
+        weight among the parallel edges it replaces.
+        Returns (dag, component) where component maps node id -> component id.
+        Time Complexity: O(V + E log E)
+        """
+        component, count = self.strongly_connected_components()
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        best = {}
+        for u in range(len(self.nodes)):
+            cu = component[u]
+            for e in range(offsets[u], offsets[u + 1]):
+                cv = component[targets[e]]
+                if cu != cv:
+                    key = cu * count + cv
+                    weight = 1 if weights is None else weights[e]
+                    if key not in best or weight < best[key]:
+                        best[key] = weight
+        dag_offsets, dag_targets = array('q', [0]) * (count + 1), array('q')
+        dag_weights = None if weights is None else _zero_weights(weights, 0)
+        for key in sorted(best):
+            cu, cv = divmod(key, count)
+            dag_offsets[cu + 1] += 1
+            dag_targets.append(cv)
+            if weights is not None:
+                dag_weights.append(best[key])
+        for i in range(count):
+            dag_offsets[i + 1] += dag_offsets[i]
+        return CSRGraph(range(count), dag_offsets, dag_targets, dag_weights, range(count)), component
+
+
+class IncrementalMST:
+    """
+    Minimum spanning forest of an undirected weighted graph, maintained as edges are inserted,
+    instead of re-running kruskal over every edge after each insertion.
+    A union-find (iterative find, union by rank) tracks components, and the forest is kept as
+    an adjacency dict so the heaviest edge on a tree path can be found.
+    """
+
+    def __init__(self, edges=()):
+        self.parent, self.rank = {}, {}
+        self.tree = defaultdict(dict)  # u -> {v: weight}, both directions
+        self.weight = 0
+        self.add_edges(edges)
+
+    def __len__(self):
+        return sum(len(neighbors) for neighbors in self.tree.values()) // 2
+
+    def edges(self):
+        """
+        Returns a list of (u, v, weight) edges in the current forest.
+        """
+        seen, result = set(), []
+        for u, neighbors in self.tree.items():
+            seen.add(u)
+            for v, weight in neighbors.items():
+                if v not in seen:
+                    result.append((u, v, weight))
+        return result
+
+    def find(self, x):
+        parent = self.parent
+        if x not in parent:
+            parent[x], self.rank[x] = x, 0
+        while parent[x] != x:
+            # path halving
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, x, y):
+        x, y = self.find(x), self.find(y)
+        if x == y:
+            return False
+        if self.rank[x] < self.rank[y]:
+            x, y = y, x
+        self.parent[y] = x
+        self.rank[x] += self.rank[x] == self.rank[y]
+        return True
+
+    def _link(self, u, v, weight):
+        self.tree[u][v] = self.tree[v][u] = weight
+        self.weight += weight
+
+    def _cut(self, u, v):
+        self.weight -= self.tree[u].pop(v)
+        del self.tree[v][u]
+
+    def _heaviest_on_path(self, u, v):
+        """
+        Heaviest edge (a, b, weight) on the tree path from u to v, found by an iterative DFS.
+        Time Complexity: O(size of the tree)
+        """
+        parent, stack = {u: None}, [u]
+        while stack:
+            x = stack.pop()
+            if x == v:
+                break
+            for y in self.tree[x]:
+                if y not in parent:
+                    parent[y] = x
+                    stack.append(y)
+        best = None
+        while parent[v] is not None:
+            a = parent[v]
+            if best is None or self.tree[a][v] > best[2]:
+                best = (a, v, self.tree[a][v])
+            v = a
+        return best
+
+    def add_edge(self, u, v, weight):
+        """
+        Insert one edge. If u and v are already connected, the new edge replaces the heaviest
+        edge on the tree path between them when it is lighter (cycle property).
+        Returns True if the forest changed.
+        Time Complexity: O(alpha(V)) across components, O(V) within one
+        """
+        if u == v:
+            return False
+        if self.union(u, v):
+            self._link(u, v, weight)
+            return True
+        a, b, heaviest = self._heaviest_on_path(u, v)
+        if heaviest <= weight:
+            return False
+        self._cut(a, b)
+        self._link(u, v, weight)
+        return True
+
+    def add_edges(self, edges):
+        """
+        Insert a batch of (u, v, weight) edges. The new forest is the MST of the old forest
+        plus the batch, so kruskal only has to sort V - 1 + k edges, not the whole history.
+        Time Complexity: O((V + k) log(V + k)) for k edges
+        """
+        edges = list(edges)
+        if not edges:
+            return
+        candidates = sorted(self.edges() + edges, key=lambda edge: edge[2])
+        nodes = list(self.parent)
+        self.parent, self.rank = {}, {}
+        self.tree, self.weight = defaultdict(dict), 0
+        for node in nodes:
+            self.find(node)
+        for u, v, weight in candidates:
+            if u != v and self.union(u, v):
+                self._link(u, v, weight)
+
+
+# worker-side state for CSRGraph.multi_source_dijkstra: a CSRGraph over shared memory views
+_shared_graph = None
+_shared_blocks = []
+_shared_mode = 'lazy'
+
+
+def _attach_shared_graph(layout, mode, plain_weights=None):
+    global _shared_graph, _shared_mode
+    views = []
+    for name, typecode, length in layout:
+        block = shared_memory.SharedMemory(name=name)
+        # keep the block open as long as the view is used
+        _shared_blocks.append(block)
+        views.append(block.buf[:length * array(typecode).itemsize].cast(typecode))
+    offsets, targets, weights = (views + [plain_weights])[:3]
+    n = len(offsets) - 1
+    # labels are the ids themselves
+    _shared_graph = CSRGraph(range(n), offsets, targets, weights, range(n))
+    _shared_mode = mode
+
+
+def _shared_distance_rows(batch):
+    return [(s, _shared_graph._distance_row(_shared_graph._distances(s, _shared_mode))) for s in batch]
+
+
+# run from the repo root: python -m algorithms.graphs
+if __name__ == '__main__':
+    from itertools import accumulate
+    import random
+    import tempfile
+    import time
+    import tracemalloc
+
+    def random_graph(n, m, seed=1):
+        # every node gets m // n out-edges, Graph.dijkstra needs each node as a key
+        rng = random.Random(seed)
+        g = Graph()
+        for u in range(n):
+            for _ in range(m // n):
+                g.add_edge(u, rng.randrange(n), rng.randint(1, 100))
+        return g
+
+    def grid_graph(rows, cols, seed=1):
+        # node id r * cols + c, edges to the 4 neighbors in both directions
+        rng = random.Random(seed)
+        g = Graph()
+        for r in range(rows):
+            for c in range(cols):
+                for R, C in (r + 1, c), (r, c + 1):
+                    if R < rows and C < cols:
+                        w = rng.randint(1, 10)
+                        g.add_edge(r * cols + c, R * cols + C, w)
+                        g.add_edge(R * cols + C, r * cols + c, w)
+        return g
+
+    def timed(label, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        print('{:28s} {:8.3f}s'.format(label, time.perf_counter() - start))
+        return result
+
+    def csr_test(n, m):
+        tracemalloc.start()
+        g = random_graph(n, m)
+        dict_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        tracemalloc.start()
+        csr = g.freeze()
+        csr_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print('n={} m={}: dict-of-lists {:.1f} MB, CSR {:.1f} MB'.format(
+            n, m, dict_bytes / 2 ** 20, csr_bytes / 2 ** 20))
+
+        for name in ('dfs', 'bfs', 'dijkstra'):
+            a = timed('Graph.' + name, getattr(g, name), 0)
+            b = timed('CSRGraph.' + name, getattr(csr, name), 0)
+            assert a == {k: v for k, v in b.items() if k in a} if name == 'dijkstra' else a == b
+        a = timed('Graph.kruskal', g.kruskal)
+        b = timed('CSRGraph.kruskal', csr.kruskal)
+        assert sum(w for _, _, w in a) == sum(w for _, _, w in b)
+
+    def point_to_point_test(name, g, pairs, heuristic=None):
+        print(name)
+        g.freeze().reverse()
+        start = time.perf_counter()
+        expected = [g.dijkstra(s)[t] for s, t in pairs]
+        print('{:28s} {:8.3f}s'.format('  full dijkstra', time.perf_counter() - start))
+        methods = [('dijkstra', None), ('bidirectional', None)]
+        if heuristic is not None:
+            methods.append(('astar', heuristic))
+        for method, h in methods:
+            start = time.perf_counter()
+            got = [g.shortest_path(s, t, method, h)[0] for s, t in pairs]
+            print('{:28s} {:8.3f}s'.format('  ' + method, time.perf_counter() - start))
+            assert got == expected
+
+    def dijkstra_mode_test(n, degree):
+        print('dense random n={} m={}'.format(n, n * degree))
+        csr = random_graph(n, n * degree).freeze()
+        results = []
+        for mode in ('lazy', 'indexed'):
+            tracemalloc.start()
+            start = time.perf_counter()
+            results.append(csr.dijkstra(0, mode))
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print('  {:26s} {:8.3f}s  peak {:.1f} MB'.format(mode, elapsed, peak / 2 ** 20))
+        assert results[0] == results[1]
+
+    def multi_source_test(n, degree, sources):
+        print('multi-source n={} m={} sources={}'.format(n, n * degree, sources))
+        csr = random_graph(n, n * degree).freeze()
+        start = time.perf_counter()
+        expected = {s: csr._distance_row(csr._distances(s, 'lazy')) for s in range(sources)}
+        sequential = time.perf_counter() - start
+        print('  {:26s} {:8.3f}s'.format('sequential', sequential))
+        for workers in sorted({1, 2, os.cpu_count() or 1}):
+            start = time.perf_counter()
+            for s, row in csr.multi_source_dijkstra(range(sources), max_workers=workers):
+                assert row == expected[s]
+            elapsed = time.perf_counter() - start
+            print('  {:26s} {:8.3f}s  speedup {:.2f}x'.format(
+                '{} workers'.format(workers), elapsed, sequential / elapsed))
+
+    def integer_weight_test(n, degree):
+        print('integer weights n={} m={}'.format(n, n * degree))
+        for max_weight in (1, 10, 100, 1_000, 10_000, 1_000_000):
+            rng = random.Random(max_weight)
+            g = Graph()
+            for u in range(n):
+                for _ in range(degree):
+                    g.add_edge(u, rng.randrange(n), rng.randint(1, max_weight))
+            csr = g.freeze()
+            start = time.perf_counter()
+            expected = g.dijkstra(0)
+            line = ['Graph {:.3f}s'.format(time.perf_counter() - start)]
+            for mode in ('lazy', 'dial', 'radix', 'auto'):
+                start = time.perf_counter()
+                assert csr.dijkstra(0, mode) == expected
+                line.append('{} {:.3f}s'.format(mode, time.perf_counter() - start))
+            print('  C={:<9d} {}'.format(max_weight, '  '.join(line)))
+
+    def mst_test():
+        # kruskal sorts E edges (in C), prim pays a Python-level log V sift per decrease-key
+        for n, degree in ((100_000, 4), (20_000, 20), (2_000, 200), (1_000, 999)):
+            csr = random_graph(n, n * degree).freeze()
+            print('mst n={} m={}'.format(n, n * degree))
+            a = timed('  CSRGraph.kruskal', csr.kruskal)
+            b = timed('  CSRGraph.prim', csr.prim)
+            assert sum(w for _, _, w in a) == sum(w for _, _, w in b)
+
+        n, m = 2_000, 20_000
+        rng = random.Random(3)
+        edges = [(rng.randrange(n), rng.randrange(n), rng.randint(1, 100)) for _ in range(m)]
+        print('incremental mst n={} inserting m={} edges'.format(n, m))
+        # cost per inserted edge, versus re-running kruskal over all edges after each insertion
+        start = time.perf_counter()
+        mst = IncrementalMST()
+        for edge in edges:
+            mst.add_edge(*edge)
+        print('{:28s} {:8.1f}us/edge'.format('  add_edge', (time.perf_counter() - start) / m * 1e6))
+        start = time.perf_counter()
+        batched = IncrementalMST()
+        for i in range(0, m, 1_000):
+            batched.add_edges(edges[i:i + 1_000])
+        print('{:28s} {:8.1f}us/edge'.format('  add_edges x1000', (time.perf_counter() - start) / m * 1e6))
+        g, calls, elapsed = Graph(), 0, 0
+        for i, edge in enumerate(edges):
+            g.add_edge(*edge)
+            if i % 500 == 0:
+                start = time.perf_counter()
+                g.kruskal()
+                elapsed += time.perf_counter() - start
+                calls += 1
+        print('{:28s} {:8.1f}us/edge'.format('  kruskal per insertion', elapsed / calls * 1e6))
+        assert mst.weight == batched.weight == sum(w for _, _, w in g.kruskal())
+
+    def load_test(n, m):
+        print('load n={} m={}'.format(n, m))
+        rng = random.Random(4)
+        edges = [(rng.randrange(n), rng.randrange(n), rng.randint(1, 100)) for _ in range(m)]
+        g = Graph()
+        start = time.perf_counter()
+        for edge in edges:
+            g.add_edge(*edge)
+        csr = g.freeze()
+        print('{:28s} {:8.3f}s'.format('  add_edge + freeze', time.perf_counter() - start))
+        with tempfile.TemporaryDirectory() as tmp:
+            text, binary = os.path.join(tmp, 'g.txt'), os.path.join(tmp, 'g.csr')
+            csr.to_edge_list(text)
+            csr.save(binary)
+            loaded = timed('  from_edge_list', CSRGraph.from_edge_list, text)
+            mapped = timed('  load (mmap)', CSRGraph.load, binary)
+            assert loaded.dijkstra(0) == mapped.dijkstra(0) == csr.dijkstra(0)
+            del mapped
+
+    def power_law_graph(n, m, exponent=2.1, seed=1):
+        # Chung-Lu style: endpoints drawn with probability ~ rank^(-1 / (exponent - 1)), undirected
+        rng = random.Random(seed)
+        cum_weights = list(accumulate((i + 1) ** (-1 / (exponent - 1)) for i in range(n)))
+        g = Graph()
+        us = rng.choices(range(n), cum_weights=cum_weights, k=m)
+        vs = rng.choices(range(n), cum_weights=cum_weights, k=m)
+        for u, v in zip(us, vs):
+            g.add_edge(u, v)
+            g.add_edge(v, u)
+        return g
+
+    def bfs_test(n, m):
+        print('power-law bfs n={} m={}'.format(n, 2 * m))
+        g = power_law_graph(n, m)
+        csr = g.freeze()
+        csr.reverse()
+        a = timed('  Graph.bfs', g.bfs, 0)
+        b = timed('  CSRGraph.bfs', csr.bfs, 0)
+        top_down = timed('  bfs_levels top-down only', csr.bfs_levels, 0, 0)
+        optimized = timed('  bfs_levels', csr.bfs_levels, 0)
+        assert a == b == {csr.nodes[i] for i, level in enumerate(optimized) if level >= 0}
+        assert top_down == optimized
+
+    def scc_test(n):
+        # a chain of 1000-node cycles, one DFS path through all n nodes: far past the recursion limit
+        print('scc n={}'.format(n))
+        rng = random.Random(5)
+        g = Graph()
+        for u in range(n):
+            block = u - u % 1000
+            g.add_edge(u, u + 1 if u % 1000 < 999 else block)
+            g.add_edge(u, rng.randrange(block, u + 1))
+            if u % 1000 == 999 and u + 1 < n:
+                g.add_edge(u, u + 1)
+        csr = g.freeze()
+        component, count = timed('  strongly_connected_components', csr.strongly_connected_components)
+        dag, _ = timed('  condensation', csr.condensation)
+        print('  {} components, condensation has {} edges'.format(count, len(dag.targets)))
+
+    csr_test(100_000, 1_000_000)
+    dijkstra_mode_test(5_000, 500)
+    integer_weight_test(100_000, 8)
+    mst_test()
+    load_test(200_000, 2_000_000)
+    bfs_test(200_000, 2_000_000)
+    scc_test(2_000_000)
+    multi_source_test(20_000, 10, 64)
+
+    rng = random.Random(2)
+    n = 200_000
+    point_to_point_test('random n={} m={}'.format(n, 4 * n), random_graph(n, 4 * n),
+                        [(rng.randrange(n), rng.randrange(n)) for _ in range(10)])
+    side = 300
+    manhattan = lambda u, v: abs(u // side - v // side) + abs(u % side - v % side)
+    point_to_point_test('grid {0}x{0}'.format(side), grid_graph(side, side),
+                        [(rng.randrange(side * side), rng.randrange(side * side)) for _ in range(10)],
+                        manhattan)
@@ -8,36 +8,162 @@
 # - Combinatorics (permutations, combinations, binomial coefficients)
 # - Number theory (Euler's Totient function, Fibonacci sequence)
 # - Matrix operations (multiplication, exponentiation)
+#
+# Memoized helpers go through one bounded cache policy: see memoize, cache_info, cache_clear
+# and set_cache_size.
 
 import math
+import random
+from array import array
 from functools import lru_cache
+from itertools import compress
+from operator import index, mul
+from typing import Iterator, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# ====================== Memoization ======================
+
+# name -> lru_cache wrapper of every function decorated with memoize
+_MEMOIZED = {}
+
+def memoize(maxsize: int):
+    """
+    Decorator: cache the function in an lru_cache of at most maxsize entries and register it
+    with the module cache policy, so no cache in this module grows without bound.
+    """
+    def decorate(func):
+        cached = lru_cache(maxsize=maxsize)(func)
+        _MEMOIZED[func.__name__] = cached
+        return cached
+    return decorate
+
+def cache_info() -> dict:
+    """
+    Hits, misses, maxsize and current size of every memoized function, by name.
+    """
+    return {name: cached.cache_info() for name, cached in _MEMOIZED.items()}
+
+def cache_clear(name: Optional[str] = None) -> None:
+    """
+    Empty the cache of one memoized function, or of all of them; this also resets their counters.
+    """
+    for cached in [_MEMOIZED[name]] if name is not None else _MEMOIZED.values():
+        cached.cache_clear()
+
+def set_cache_size(name: str, maxsize: Optional[int]) -> None:
+    """
+    Replace the cache of a memoized function with an empty one of maxsize entries (None for
+    unbounded). Module functions call each other by name, so they all pick up the new cache.
+    """
+    cached = lru_cache(maxsize=maxsize)(_MEMOIZED[name].__wrapped__)
+    _MEMOIZED[name] = globals()[name] = cached
 
 # ====================== Prime Numbers ======================
 
+# the first 12 primes as Miller-Rabin bases have no common strong pseudoprime below 3.18 * 10^23
+MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
 def is_prime(n: int) -> bool:
     """
-    Check if a number is prime.
-    Time Complexity: O(√n)
+    Check if a number is prime with the Miller-Rabin test over MILLER_RABIN_BASES, after trial
+    division by the same small primes. Deterministic for n < 3.18 * 10^23, which covers all
+    64-bit integers; above that it is a strong probable-prime test.
+    Time Complexity: O(log^3 n)
     """
     if n < 2:
         return False
-    for i in range(2, int(math.sqrt(n)) + 1):
-        if n % i == 0:
+    for p in MILLER_RABIN_BASES:
+        if n % p == 0:
+            return n == p
+    # n - 1 = d * 2^s with d odd
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d, s = d // 2, s + 1
+    for a in MILLER_RABIN_BASES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
             return False
     return True
 
 def sieve_of_eratosthenes(n: int) -> list[int]:
     """
-    Generate all prime numbers up to n using the Sieve of Eratosthenes.
+    Generate all prime numbers up to n using the Sieve of Eratosthenes (segmented, see primes).
     Time Complexity: O(n log log n)
     """
-    sieve = [True] * (n + 1)
-    sieve[0] = sieve[1] = False
-    for i in range(2, int(math.sqrt(n)) + 1):
-        if sieve[i]:
-            for j in range(i * i, n + 1, i):
-                sieve[j] = False
-    return [i for i, is_prime in enumerate(sieve) if is_prime]
+    return list(primes(2, n + 1))
+
+# one byte per odd number, 128 KB segments fit in L2 cache
+SIEVE_SEGMENT = 1 << 17
+SIEVE_CACHE_SEGMENTS = 64
+_SIEVE_ZEROS = bytes(SIEVE_SEGMENT)
+
+def primes(lo: int = 2, hi: Optional[int] = None) -> Iterator[int]:
+    """
+    Lazily yield the primes in [lo, hi), or every prime from lo on if hi is None.
+    Segmented odd-only sieve: each segment is a bytearray flag per odd number, sieved by the
+    primes up to its square root with one slice assignment per prime. The most recently used
+    segments are cached, so repeated and overlapping ranges are not sieved again.
+    Time Complexity: O(hi log log hi), memory O(√hi + segment size)
+    """
+    if hi is not None and hi <= lo:
+        return
+    if lo <= 2 and (hi is None or hi > 2):
+        yield 2
+    span = 2 * SIEVE_SEGMENT
+    index = max(lo, 0) // span
+    while hi is None or index * span < hi:
+        start = index * span
+        # byte i stands for start + 2i + 1
+        first = max((lo - start) // 2, 0)
+        last = SIEVE_SEGMENT if hi is None else min((hi - start) // 2, SIEVE_SEGMENT)
+        numbers = range(start + 1 + 2 * first, start + 2 * last, 2)
+        yield from compress(numbers, _sieve_segment(index)[first:last])
+        index += 1
+
+@memoize(SIEVE_CACHE_SEGMENTS)
+def _sieve_segment(index: int) -> bytes:
+    """
+    Prime flags for the odd numbers in segment index: byte i is 1 iff start + 2i + 1 is prime.
+    """
+    start = index * 2 * SIEVE_SEGMENT
+    end = start + 2 * SIEVE_SEGMENT
+    flags = bytearray(b'\x01') * SIEVE_SEGMENT
+    if index == 0:
+        flags[0] = 0
+    for p in _odd_primes_upto(1 << (math.isqrt(end).bit_length())):
+        if p * p >= end:
+            break
+        # first odd multiple of p that is >= p², smaller ones are crossed off by smaller primes
+        m = max(p * p, (start + p - 1) // p * p)
+        if m % 2 == 0:
+            m += p
+        i = (m - start - 1) // 2
+        flags[i::p] = _SIEVE_ZEROS[:len(range(i, SIEVE_SEGMENT, p))]
+    return bytes(flags)
+
+# one entry per power of two
+@memoize(64)
+def _odd_primes_upto(limit: int) -> list[int]:
+    """
+    Odd primes up to limit with a plain odd-only bytearray sieve; called with powers of two only.
+    """
+    flags = bytearray(b'\x01') * (limit // 2)
+    flags[0] = 0
+    for i in range(1, (math.isqrt(limit) + 1) // 2):
+        if flags[i]:
+            p = 2 * i + 1
+            flags[p * p // 2::p] = bytes(len(range(p * p // 2, len(flags), p)))
+    return list(compress(range(1, limit, 2), flags))
 
 # ====================== GCD and LCM ======================
 
@@ -57,6 +183,75 @@ def lcm(a: int, b: int) -> int:
     """
     return a * b // gcd(a, b)
 
+def extended_gcd(a: int, b: int) -> tuple[int, int, int]:
+    """
+    Return (g, x, y) with a * x + b * y = g = gcd(a, b), iteratively: the Bezout coefficients
+    are carried along with the remainders, so there is no recursion depth limit.
+    Time Complexity: O(log min(a, b))
+    """
+    x0, y0, x1, y1 = 1, 0, 0, 1
+    while b:
+        q = a // b
+        a, b = b, a - q * b
+        x0, x1 = x1, x0 - q * x1
+        y0, y1 = y1, y0 - q * y1
+    return a, x0, y0
+
+def gcd_batch(a, b):
+    """
+    Elementwise gcd of two sequences (list, array.array or ndarray), or of a sequence and an int.
+    Uses the np.gcd ufunc when NumPy is available and the values fit int64, math.gcd otherwise.
+    Returns an ndarray for ndarray input, a list otherwise.
+    Time Complexity: O(m log max) for m pairs
+    """
+    return _batch(a, b, math.gcd, 'gcd')
+
+def lcm_batch(a, b):
+    """
+    Elementwise lcm, like gcd_batch. The NumPy path is only taken when max|a| * max|b| fits
+    int64, so np.lcm cannot overflow.
+    Time Complexity: O(m log max) for m pairs
+    """
+    return _batch(a, b, math.lcm, 'lcm', product_bound=True)
+
+def _batch(a, b, scalar, name: str, product_bound: bool = False):
+    """
+    Shared by gcd_batch and lcm_batch: an int is broadcast against the other sequence, and the
+    NumPy ufunc np.<name> runs on int64 whenever both inputs are integers and its result is exact.
+    Anything else goes through operator.index, so floats raise TypeError instead of being truncated.
+    """
+    a = [a] * len(b) if isinstance(a, int) else a
+    b = [b] * len(a) if isinstance(b, int) else b
+    if len(a) != len(b):
+        raise ValueError("batch lengths differ: {} and {}".format(len(a), len(b)))
+    as_ndarray = np is not None and (isinstance(a, np.ndarray) or isinstance(b, np.ndarray))
+    if np is not None and _int64_exact(a) and _int64_exact(b):
+        try:
+            x, y = np.asarray(a, dtype=np.int64), np.asarray(b, dtype=np.int64)
+            exact = not product_bound or len(x) == 0 or _abs_max(x) * _abs_max(y) < 1 << 63
+        except OverflowError:
+            exact = False
+        if exact:
+            result = getattr(np, name)(x, y)
+            return result if as_ndarray else result.tolist()
+    result = list(map(scalar, map(index, a), map(index, b)))
+    return np.array(result, dtype=object) if as_ndarray else result
+
+def _int64_exact(seq) -> bool:
+    """
+    True if seq holds only ints that np.asarray(seq, dtype=np.int64) converts without truncating
+    or wrapping. Python ints too large for int64 still raise OverflowError there.
+    """
+    if isinstance(seq, np.ndarray):
+        if seq.dtype.kind == 'u' and seq.dtype.itemsize == 8:
+            return len(seq) == 0 or int(seq.max()) < 1 << 63
+        return seq.dtype.kind in 'iu'
+    return all(type(v) is int for v in seq)
+
+def _abs_max(x) -> int:
+    # abs() of int64 min wraps around, so compare as Python ints
+    return max(-int(x.min()), int(x.max()))
+
 # ====================== Modular Arithmetic ======================
 
 def mod_inverse(a: int, mod: int) -> int:
@@ -64,19 +259,39 @@ def mod_inverse(a: int, mod: int) -> int:
     Compute the modular inverse of a under modulo mod using the Extended Euclidean Algorithm.
     Time Complexity: O(log min(a, mod))
     """
-    def extended_gcd(a, b):
-        if b == 0:
-            return a, 1, 0
-        gcd, x1, y1 = extended_gcd(b, a % b)
-        x = y1
-        y = x1 - (a // b) * y1
-        return gcd, x, y
-
     gcd_val, x, _ = extended_gcd(a, mod)
     if gcd_val != 1:
         raise ValueError("Modular inverse does not exist")
     return x % mod
 
+def mod_inverse_batch(values, mod: int) -> list[int]:
+    """
+    Modular inverses of all values with Montgomery's trick: prefix products p_i = v_0 ... v_i,
+    one inverse of p_(m-1), then walking back 1/v_i = p_(i-1) / p_i and 1/p_(i-1) = v_i / p_i.
+    One extended gcd plus 3(m - 1) multiplications for m values, instead of m extended gcds.
+    Raises ValueError, naming the value, if any of them is not invertible.
+    Time Complexity: O(m + log mod)
+    """
+    values = [index(v) % mod for v in values]
+    prefix, running = [], 1
+    for v in values:
+        running = running * v % mod
+        prefix.append(running)
+    if not values:
+        return []
+    gcd_val, inv, _ = extended_gcd(prefix[-1], mod)
+    if gcd_val != 1:
+        bad = next(v for v in values if math.gcd(v, mod) != 1)
+        raise ValueError("Modular inverse does not exist for {} mod {}".format(bad, mod))
+    # inv is 1 / p_i on the way down
+    inv %= mod
+    result = [0] * len(values)
+    for i in range(len(values) - 1, 0, -1):
+        result[i] = inv * prefix[i - 1] % mod
+        inv = inv * values[i] % mod
+    result[0] = inv
+    return result
+
 def mod_pow(base: int, exp: int, mod: int) -> int:
     """
     Compute (base^exp) % mod using fast exponentiation (exponentiation by squaring).
@@ -105,83 +320,515 @@ def mod_factorial(n: int, mod: int) -> int:
 
 def binomial_coefficient(n: int, k: int) -> int:
     """
-    Compute the binomial coefficient C(n, k) using dynamic programming.
-    Time Complexity: O(n * k)
+    Compute the binomial coefficient C(n, k) exactly with the multiplicative formula (math.comb),
+    instead of an (n+1) x (k+1) Pascal table.
+    Time Complexity: O(min(k, n - k)) multiplications
     """
-    dp = [[0] * (k + 1) for _ in range(n + 1)]
-    for i in range(n + 1):
-        for j in range(min(i, k) + 1):
-            if j == 0 or j == i:
-                dp[i][j] = 1
-            else:
-                dp[i][j] = dp[i - 1][j - 1] + dp[i - 1][j]
-    return dp[n][k]
+    return math.comb(n, k)
+
+class ModCombinatorics:
+    """
+    Factorials and inverse factorials modulo a prime, kept in arrays that grow on demand
+    (doubling, so a run of growing queries costs O(N) in total), for O(1) nCr, nPr and
+    Catalan queries. Arguments of mod or more go through Lucas' theorem, which only needs
+    the table below mod, so small primes never build big tables.
+    """
+
+    def __init__(self, mod: int = 10 ** 9 + 7, n: int = 0):
+        if not is_prime(mod):
+            raise ValueError("modulus must be prime, got {}".format(mod))
+        self.mod = mod
+        # residues below 2^63 fit machine words, larger moduli fall back to lists
+        typecode = 'q' if mod < 1 << 63 else None
+        self.fact = array(typecode, [1]) if typecode else [1]
+        self.inv_fact = array(typecode, [1]) if typecode else [1]
+        self.reserve(n)
 
-@lru_cache(maxsize=None)
+    def reserve(self, n: int) -> None:
+        """
+        Make sure the tables cover 0..n (and never beyond mod - 1, where n! becomes 0).
+        Time Complexity: O(n) amortized
+        """
+        n = min(n, self.mod - 1)
+        old = len(self.fact)
+        if n < old:
+            return
+        new = min(max(n + 1, 2 * old), self.mod)
+        mod, fact = self.mod, self.fact
+        for i in range(old, new):
+            fact.append(fact[-1] * i % mod)
+        # one modular inverse for the new top, then walk down: 1/(i-1)! = i/i!
+        inv = [0] * (new - old)
+        inv[-1] = pow(fact[new - 1], mod - 2, mod)
+        for i in range(new - 1, old, -1):
+            inv[i - 1 - old] = inv[i - old] * i % mod
+        self.inv_fact.extend(inv)
+
+    def factorial(self, n: int) -> int:
+        """
+        n! mod p, 0 once n reaches p.
+        Time Complexity: O(1) after the table covers n
+        """
+        if n >= self.mod:
+            return 0
+        self.reserve(n)
+        return self.fact[n]
+
+    def binomial(self, n: int, k: int) -> int:
+        """
+        C(n, k) mod p from the tables, and by Lucas' theorem for n >= p: the product of
+        C(n_i, k_i) over the base p digits of n and k.
+        Time Complexity: O(1) for n < p, O(log_p n) otherwise
+        """
+        if k < 0 or k > n:
+            return 0
+        mod = self.mod
+        if n < mod:
+            self.reserve(n)
+            return self.fact[n] * self.inv_fact[k] % mod * self.inv_fact[n - k] % mod
+        result = 1
+        while n and result:
+            result = result * self.binomial(n % mod, k % mod) % mod
+            n, k = n // mod, k // mod
+        return result
+
+    def permutation(self, n: int, k: int) -> int:
+        """
+        P(n, k) = n! / (n - k)! mod p. For n >= p the k factors n, n-1, ..., n-k+1 are 0 mod p
+        as soon as they pass a multiple of p, otherwise they are the residues of n % p downwards.
+        Time Complexity: O(1)
+        """
+        if k < 0 or k > n:
+            return 0
+        n %= self.mod
+        if k > n:
+            return 0
+        self.reserve(n)
+        return self.fact[n] * self.inv_fact[n - k] % self.mod
+
+    def catalan(self, n: int) -> int:
+        """
+        nth Catalan number mod p as C(2n, n) - C(2n, n + 1), which needs no inverse of n + 1
+        (that inverse does not exist when p divides n + 1).
+        Time Complexity: O(1) for 2n < p
+        """
+        return (self.binomial(2 * n, n) - self.binomial(2 * n, n + 1)) % self.mod
+
+CATALAN_CACHE_SIZE = 1024
+
+@memoize(CATALAN_CACHE_SIZE)
 def catalan_number(n: int) -> int:
     """
-    Compute the nth Catalan number using recursion with memoization.
-    Time Complexity: O(n^2)
+    Compute the nth Catalan number with the closed form C(2n, n) / (n + 1).
+    Time Complexity: O(n) multiplications
     """
-    if n <= 1:
-        return 1
-    result = 0
-    for i in range(n):
-        result += catalan_number(i) * catalan_number(n - 1 - i)
-    return result
+    if n < 0:
+        return 0
+    return math.comb(2 * n, n) // (n + 1)
+
+def catalan_numbers(n: int) -> list[int]:
+    """
+    The Catalan numbers C(0) .. C(n), iteratively with C(k+1) = C(k) * 2(2k+1) / (k+2).
+    Time Complexity: O(n) multiplications
+    """
+    result = [1]
+    for k in range(n):
+        result.append(result[-1] * 2 * (2 * k + 1) // (k + 2))
+    return result[:n + 1]
 
 # ====================== Number Theory ======================
 
+FACTOR_CACHE_SIZE = 1 << 16
+
+def factorize(n: int) -> dict[int, int]:
+    """
+    Prime factorization of n >= 1 as {prime: exponent}: trial division by the primes below 1000,
+    then Pollard-Brent rho on what is left, splitting until every part passes is_prime.
+    The last FACTOR_CACHE_SIZE results are cached and shared by the divisor functions.
+    Time Complexity: O(n^(1/4)) expected per split
+    """
+    if n < 1:
+        raise ValueError("factorize needs n >= 1, got {}".format(n))
+    return dict(_factorize(n))
+
+@memoize(FACTOR_CACHE_SIZE)
+def _factorize(n: int) -> tuple[tuple[int, int], ...]:
+    factors = {}
+    for p in [2] + _odd_primes_upto(1024):
+        if p * p > n:
+            break
+        while n % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            n //= p
+    stack = [n] if n > 1 else []
+    while stack:
+        m = stack.pop()
+        if is_prime(m):
+            factors[m] = factors.get(m, 0) + 1
+        else:
+            d = pollard_brent(m)
+            stack += [d, m // d]
+    return tuple(sorted(factors.items()))
+
+# own generator, so factoring neither reseeds nor advances the caller's global random state
+_POLLARD_RNG = random.Random()
+
+def pollard_brent(n: int) -> int:
+    """
+    Find a nontrivial factor of a composite n with Brent's variant of Pollard's rho: the cycle of
+    x -> x^2 + c (mod n) is found by doubling the stride, and the gcd is taken once per batch
+    of 128 steps on the product of the differences. A batch that overshoots to gcd n is
+    replayed one step at a time, and a failed c is retried with a new random one.
+    Time Complexity: O(n^(1/4)) expected
+    """
+    if n % 2 == 0:
+        return 2
+    batch = 128
+    while True:
+        y, c = _POLLARD_RNG.randrange(1, n), _POLLARD_RNG.randrange(1, n)
+        g = r = q = 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(batch, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += batch
+            r *= 2
+        if g == n:
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+        if g != n:
+            return g
+
 def euler_totient(n: int) -> int:
     """
     Compute Euler's Totient function φ(n), which counts the number of integers up to n that are coprime with n.
-    Time Complexity: O(√n)
+    φ(n) = n * Π(1 - 1/p) over the primes p dividing n, from the cached factorization.
+    Time Complexity: O(n^(1/4)) expected
     """
+    if n < 1:
+        return 0
     result = n
-    p = 2
-    while p * p <= n:
-        if n % p == 0:
-            while n % p == 0:
-                n = n // p
-            result -= result // p
-        p += 1
-    if n > 1:
-        result -= result // n
+    for p in factorize(n):
+        result -= result // p
     return result
 
-@lru_cache(maxsize=None)
-def fibonacci(n: int) -> int:
+def divisors(n: int) -> list[int]:
     """
-    Compute the nth Fibonacci number using recursion with memoization.
-    Time Complexity: O(n)
+    All positive divisors of n in increasing order, built from the cached factorization.
+    Time Complexity: O(n^(1/4) + d(n) log d(n))
+    """
+    result = [1]
+    for p, e in factorize(n).items():
+        result = [d * p ** k for d in result for k in range(e + 1)]
+    return sorted(result)
+
+def divisor_count(n: int) -> int:
+    """
+    Number of positive divisors d(n) = Π(e + 1) over the prime powers p^e of n.
+    Time Complexity: O(n^(1/4)) expected
+    """
+    return math.prod(e + 1 for e in factorize(n).values())
+
+def divisor_sum(n: int, k: int = 1) -> int:
+    """
+    Sum of the k-th powers of the positive divisors σ_k(n) = Π(1 + p^k + ... + p^(ek)).
+    Time Complexity: O(n^(1/4)) expected
+    """
+    return math.prod(sum(p ** (k * i) for i in range(e + 1)) for p, e in factorize(n).items())
+
+def fibonacci(n: int, mod: Optional[int] = None) -> int:
+    """
+    Compute the nth Fibonacci number (mod mod if given) by fast doubling, iterative over the
+    bits of n: F(2k) = F(k) * (2F(k+1) - F(k)), F(2k+1) = F(k)^2 + F(k+1)^2.
+    Time Complexity: O(log n) multiplications
+    """
+    return _fibonacci_pair(n, mod)[0]
+
+def _fibonacci_pair(n: int, mod: Optional[int] = None) -> tuple[int, int]:
+    """
+    (F(n), F(n+1)), reduced mod mod if given.
+    """
+    if n < 0:
+        raise ValueError("fibonacci needs n >= 0, got {}".format(n))
+    a, b = 0, 1
+    for bit in bin(n)[2:]:
+        a, b = a * (2 * b - a), a * a + b * b
+        if bit == '1':
+            a, b = b, a + b
+        if mod is not None:
+            a, b = a % mod, b % mod
+    return (a % mod, b % mod) if mod is not None else (a, b)
+
+def fibonacci_batch(ns: list[int], mod: Optional[int] = None) -> list[int]:
+    """
+    F(n) for every n in ns. The distinct n are visited in increasing order and each one is
+    reached from the previous by the addition formulas
+    F(m+d) = F(m)F(d+1) + F(m+1)F(d) - F(m)F(d), F(m+d+1) = F(m+1)F(d+1) + F(m)F(d),
+    so only the gaps d are doubled, and dense queries cost O(1) each.
+    Time Complexity: O(Σ log(gap)) multiplications
+    """
+    values, m, fm, fm1 = {}, 0, 0, 1
+    for n in sorted(set(ns)):
+        fd, fd1 = _fibonacci_pair(n - m, mod)
+        fm, fm1 = fm * fd1 + fm1 * fd - fm * fd, fm1 * fd1 + fm * fd
+        if mod is not None:
+            fm, fm1 = fm % mod, fm1 % mod
+        values[n], m = fm, n
+    return [values[n] for n in ns]
+
+def linear_recurrence(coeffs: list[int], initial: list[int], n: int, mod: Optional[int] = None,
+                      method: str = 'kitamasa') -> int:
+    """
+    nth term of a(k) = coeffs[0] * a(k-1) + ... + coeffs[d-1] * a(k-d), with a(0..d-1) = initial.
+    method: 'kitamasa' (x^n mod the characteristic polynomial) or 'matrix' (companion matrix
+    power with matrix_pow).
+    Time Complexity: O(d^2 log n) for kitamasa, O(d^3 log n) for matrix
+    """
+    return linear_recurrence_batch(coeffs, initial, [n], mod, method)[0]
+
+def linear_recurrence_batch(coeffs: list[int], initial: list[int], ns: list[int], mod: Optional[int] = None,
+                            method: str = 'kitamasa') -> list[int]:
+    """
+    linear_recurrence for every n in ns. With kitamasa the squarings x^(2^i) mod the
+    characteristic polynomial are computed once and shared, so each n only pays for the
+    multiplications of its set bits.
+    Time Complexity: O(d^2 (log max(ns) + Σ popcount(n)))
     """
-    if n <= 1:
-        return n
-    return fibonacci(n - 1) + fibonacci(n - 2)
+    d = len(coeffs)
+    if d == 0 or len(initial) != d:
+        raise ValueError("need as many initial terms as coefficients, got {} and {}".format(len(initial), d))
+    if min(ns, default=0) < 0:
+        raise ValueError("linear recurrence needs n >= 0")
+    if method == 'matrix':
+        companion = [list(coeffs)] + [[int(i == j) for j in range(d)] for i in range(d - 1)]
+        state = [[x] for x in reversed(initial)]
+        # companion^n maps [a(d-1) .. a(0)] to [a(n+d-1) .. a(n)]
+        return [matrix_multiply(matrix_pow(companion, n, mod), state, mod)[d - 1][0] for n in ns]
+    if method != 'kitamasa':
+        raise ValueError("unknown method: {!r}".format(method))
+
+    def mulmod(p: list[int], q: list[int]) -> list[int]:
+        # p * q mod x^d - coeffs[0] x^(d-1) - ... - coeffs[d-1]
+        prod = [0] * (2 * d - 1)
+        for i, x in enumerate(p):
+            if x:
+                for j, y in enumerate(q):
+                    prod[i + j] += x * y
+        for k in range(2 * d - 2, d - 1, -1):
+            t = prod[k]
+            if t:
+                for j, c in enumerate(coeffs, 1):
+                    prod[k - j] += t * c
+        return [x % mod for x in prod[:d]] if mod is not None else prod[:d]
+
+    # squares[i] = x^(2^i) reduced, x itself is coeffs[0] when d == 1
+    squares = [[coeffs[0]] if d == 1 else [0, 1] + [0] * (d - 2)]
+    for _ in range(max(ns, default=0).bit_length()):
+        squares.append(mulmod(squares[-1], squares[-1]))
+    result = []
+    for n in ns:
+        if n < d:
+            result.append(initial[n] % mod if mod is not None else initial[n])
+            continue
+        poly = [1] + [0] * (d - 1)
+        for i in range(n.bit_length()):
+            if n >> i & 1:
+                poly = mulmod(poly, squares[i])
+        value = sum(r * a for r, a in zip(poly, initial))
+        result.append(value % mod if mod is not None else value)
+    return result
 
 # ====================== Matrix Operations ======================
 
-def matrix_multiply(a: list[list[int]], b: list[list[int]]) -> list[list[int]]:
+# columns of b per block, a block of columns is reused by every row of a before moving on
+MATRIX_BLOCK = 64
+
+def matrix_multiply(a: list[list[int]], b: list[list[int]], mod: Optional[int] = None) -> list[list[int]]:
     """
-    Multiply two matrices a and b.
+    Multiply two matrices a and b, entries reduced mod mod if given.
+    b is transposed once, so every entry is a dot product of two rows, sum(map(mul, row, col)),
+    instead of walking b column-wise; columns are taken MATRIX_BLOCK at a time.
     Time Complexity: O(n^3) for n x n matrices
     """
-    result = [[0] * len(b[0]) for _ in range(len(a))]
-    for i in range(len(a)):
-        for j in range(len(b[0])):
-            for k in range(len(b)):
-                result[i][j] += a[i][k] * b[k][j]
+    cols = list(zip(*b))
+    result = [[0] * len(cols) for _ in range(len(a))]
+    for j0 in range(0, len(cols), MATRIX_BLOCK):
+        block = cols[j0:j0 + MATRIX_BLOCK]
+        for row, out in zip(a, result):
+            for j, col in enumerate(block, j0):
+                out[j] = sum(map(mul, row, col))
+    if mod is not None:
+        result = [[x % mod for x in row] for row in result]
     return result
 
-def matrix_pow(matrix: list[list[int]], exp: int) -> list[list[int]]:
+def matrix_pow(matrix: list[list[int]], exp: int, mod: Optional[int] = None) -> list[list[int]]:
     """
-    Raise a matrix to the power of exp using exponentiation by squaring.
+    Raise a matrix to the power of exp using exponentiation by squaring, entries reduced mod mod if given.
     Time Complexity: O(n^3 log exp) for n x n matrices
     """
     result = [[1 if i == j else 0 for j in range(len(matrix))] for i in range(len(matrix))]
     while exp > 0:
         if exp % 2 == 1:
-            result = matrix_multiply(result, matrix)
-        matrix = matrix_multiply(matrix, matrix)
+            result = matrix_multiply(result, matrix, mod)
+        matrix = matrix_multiply(matrix, matrix, mod)
         exp = exp // 2
     return result
+
+def matrix_multiply_np(a: list[list[int]], b: list[list[int]], mod: Optional[int] = None) -> list[list[int]]:
+    """
+    matrix_multiply with NumPy: int64 when no entry can overflow, exact object dtype (Python ints)
+    otherwise. Falls back to matrix_multiply without NumPy.
+    Time Complexity: O(n^3), in C for int64
+    """
+    if np is None:
+        return matrix_multiply(a, b, mod)
+    x, y = _np_matrices(a, b, mod)
+    return _np_matmul(x, y, mod).tolist()
+
+def matrix_pow_np(matrix: list[list[int]], exp: int, mod: Optional[int] = None) -> list[list[int]]:
+    """
+    matrix_pow with NumPy, the matrix stays an ndarray across all squarings. Without mod the
+    entries grow without bound, so it runs in object dtype.
+    Time Complexity: O(n^3 log exp)
+    """
+    if np is None:
+        return matrix_pow(matrix, exp, mod)
+    base, _ = _np_matrices(matrix, matrix, mod, growing=mod is None)
+    result = np.identity(len(matrix), dtype=base.dtype)
+    while exp > 0:
+        if exp % 2 == 1:
+            result = _np_matmul(result, base, mod)
+        base = _np_matmul(base, base, mod)
+        exp = exp // 2
+    return result.tolist()
+
+def _np_matrices(a: list[list[int]], b: list[list[int]], mod: Optional[int],
+                 growing: bool = False) -> tuple:
+    """
+    a and b as ndarrays of a dtype that _np_matmul cannot overflow: int64 if entries are below
+    a 31-bit mod or small enough for n * max|a| * max|b| < 2^63, object dtype otherwise.
+    """
+    n = len(b)
+    if mod is not None:
+        a, b = [[x % mod for x in row] for row in a], [[x % mod for x in row] for row in b]
+        fits = mod < 1 << 31 and n < 1 << 16 or n * (mod - 1) ** 2 < 1 << 63
+    else:
+        bound = (max((abs(x) for row in a for x in row), default=0)
+                 * max((abs(x) for row in b for x in row), default=0))
+        fits = not growing and n * bound < 1 << 63
+    dtype = np.int64 if fits else object
+    return np.array(a, dtype=dtype).reshape(len(a), n), np.array(b, dtype=dtype).reshape(n, -1)
+
+def _np_matmul(x, y, mod: Optional[int]):
+    """
+    x @ y (mod mod). For int64 with a 31-bit mod whose products could overflow the sum, y is
+    split into 16-bit halves, x @ y = (x @ y_hi) * 2^16 + x @ y_lo, each half sum fits in int64.
+    """
+    if mod is None:
+        return x.dot(y)
+    if x.dtype == object or x.shape[1] * (mod - 1) ** 2 < 1 << 63:
+        return x.dot(y) % mod
+    hi, lo = y >> 16, y & 0xFFFF
+    return (x.dot(hi) % mod * (1 << 16) + x.dot(lo) % mod) % mod
+
+# run from the repo root: python -m algorithms.math
+if __name__ == '__main__':
+    import time
+
+    def trial_division(n: int) -> bool:
+        if n < 2:
+            return False
+        for i in range(2, math.isqrt(n) + 1):
+            if n % i == 0:
+                return False
+        return True
+
+    # batch: one call with all inputs, still reported per input
+    def bench(name, func, inputs, batch=False):
+        start = time.perf_counter()
+        if batch:
+            func(inputs)
+        else:
+            for n in inputs:
+                func(n)
+        elapsed = time.perf_counter() - start
+        print('{:38s} {:12.2f} us/call'.format(name, elapsed / len(inputs) * 1e6))
+
+    rng = random.Random(0)
+    for bits, count in ((32, 200), (64, 200)):
+        inputs = [rng.getrandbits(bits) | 1 for _ in range(count)]
+        # the expensive case for trial division: primes
+        prime_inputs = [n for n in (rng.getrandbits(bits) | 1 for _ in range(100 * count)) if is_prime(n)][:count]
+        bench('is_prime {}-bit random'.format(bits), is_prime, inputs)
+        bench('is_prime {}-bit primes'.format(bits), is_prime, prime_inputs)
+        if bits == 32:
+            bench('trial division {}-bit primes'.format(bits), trial_division, prime_inputs[:20])
+        cache_clear('_factorize')
+        bench('factorize {}-bit random'.format(bits), factorize, inputs)
+        bench('factorize {}-bit cached'.format(bits), factorize, inputs)
+        cache_clear('_factorize')
+        bench('euler_totient {}-bit random'.format(bits), euler_totient, inputs)
+        # two primes of half the size, the hard case for rho
+        halves = [n for n in (rng.getrandbits(bits // 2) | 1 for _ in range(2000)) if is_prime(n)]
+        semiprimes = [p * q for p, q in zip(halves[::2], halves[1::2])][:20]
+        cache_clear('_factorize')
+        bench('factorize {}-bit semiprimes'.format(bits), factorize, semiprimes)
+
+    mod = 10 ** 9 + 7
+    comb = ModCombinatorics(mod, 10 ** 5)
+    queries = [(n, rng.randrange(n + 1)) for n in (rng.randrange(1, 10 ** 5) for _ in range(2000))]
+    bench('ModCombinatorics.binomial', lambda q: comb.binomial(*q), queries)
+    bench('math.comb % p', lambda q: math.comb(*q) % mod, queries[:200])
+
+    dense = list(range(20000))
+    bench('fibonacci mod p, one by one', lambda n: fibonacci(n, mod), dense)
+    bench('fibonacci_batch mod p, dense', lambda ns: fibonacci_batch(ns, mod), dense, batch=True)
+    coeffs, initial = [rng.randrange(mod) for _ in range(30)], list(range(30))
+    sparse = [rng.getrandbits(60) for _ in range(50)]
+    bench('linear_recurrence d=30 kitamasa', lambda n: linear_recurrence(coeffs, initial, n, mod), sparse[:10])
+    bench('linear_recurrence d=30 matrix', lambda n: linear_recurrence(coeffs, initial, n, mod, 'matrix'), sparse[:2])
+    bench('linear_recurrence_batch d=30', lambda ns: linear_recurrence_batch(coeffs, initial, ns, mod), sparse,
+          batch=True)
+
+    # the original triple loop, walking b column-wise
+    def naive_multiply(a, b, mod=None):
+        result = [[0] * len(b[0]) for _ in range(len(a))]
+        for i in range(len(a)):
+            for j in range(len(b[0])):
+                for k in range(len(b)):
+                    result[i][j] += a[i][k] * b[k][j]
+        return [[x % mod for x in row] for row in result] if mod is not None else result
+
+    for n, high, m in ((100, 100, None), (100, mod, mod), (200, mod, mod)):
+        a = [[rng.randrange(high) for _ in range(n)] for _ in range(n)]
+        pair = [(a, a)]
+        label = '{}x{} {}'.format(n, n, 'mod p' if m else 'small ints')
+        bench('naive multiply ' + label, lambda ab: naive_multiply(*ab, m), pair)
+        bench('matrix_multiply ' + label, lambda ab: matrix_multiply(*ab, m), pair)
+        bench('matrix_multiply_np ' + label, lambda ab: matrix_multiply_np(*ab, m), pair)
+    a = [[rng.randrange(mod) for _ in range(30)] for _ in range(30)]
+    bench('matrix_pow 30x30 ^1e9 mod p', lambda e: matrix_pow(a, e, mod), [10 ** 9])
+    bench('matrix_pow_np 30x30 ^1e9 mod p', lambda e: matrix_pow_np(a, e, mod), [10 ** 9])
+
+    bench('catalan_number 1..2000', catalan_number, range(1, 2001))
+    bench('catalan_numbers(2000)', catalan_numbers, [2000])
+
+    values = [rng.randrange(1, mod) for _ in range(20000)]
+    others = [rng.randrange(1, 1 << 31) for _ in range(20000)]
+    bench('mod_inverse, one by one', lambda v: mod_inverse(v, mod), values)
+    bench('pow(v, -1, p), one by one', lambda v: pow(v, -1, mod), values)
+    bench('mod_inverse_batch', lambda vs: mod_inverse_batch(vs, mod), values, batch=True)
+    bench('gcd, one by one', lambda vw: gcd(*vw), list(zip(values, others)))
+    bench('gcd_batch', lambda vs: gcd_batch(vs, others), values, batch=True)
+    bench('lcm_batch', lambda vs: lcm_batch(vs, others), values, batch=True)
+    for name, info in cache_info().items():
+        print('{:38s} {}'.format(name, info))
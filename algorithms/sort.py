@@ -1,17 +1,34 @@
 # all kinds of sort algorithm, just some common versions to show its idea.
-# here I unify the api as xxx_sort(arr), changed in-place
+# here I unify the api as xxx_sort(arr, key=None, reverse=False), changed in-place, key and reverse as in sorted()
 #
 # currently include:
-# quick, merge, insert, bubble, selection, heap, shell, bucket, counting, radix, topological
+# intro (recommended general in-place sort)
+# nth_element and partial_sort (selection, top k)
+# quick
+# merge
+# tim (natural runs + galloping merge)
+# parallel merge (worker processes over shared memory)
+# external (external_sort(input_path, output_path) for files larger than memory)
+# insert
+# bubble
+# selection
+# heap
+# shell
+# bucket
+# counting
+# radix
+# topological (dfs, kahn waves, incremental)
 #
-# constant space vs extra space (merge O(n), counting O(k), bucket O(n+k), radix O(n+k))
+# constant space vs extra space (merge O(n), tim O(n), counting O(k), bucket O(n+k), radix O(n+k))
 #
-# in place vs out place (merge, counting, bucket, radix)
+# in place vs out place (merge, tim, counting, bucket, radix)
 #
-# stable vs unstable (selection, quick, heap, shell)
+# stable vs unstable (selection, quick, intro, heap, shell)
 #
 # comparison based vs non-comparison based (radix, bucket, counting)
 #
+# counting, bucket and radix also have numpy versions (xxx_sort_np), falling back to pure python without numpy
+#
 # comparison of counting, bucket and radix sort: all use bucket idea
 # counting sort:  store the single key in bucket
 # bucket sort:    store a range in bucket
@@ -23,16 +40,69 @@
 # insert    O(n^2)      O(n)        O(n^2)      O(1)    in-place    stable      comparison
 # shell     O(nlogn)    O(nlogn^2)  O(nlogn^2)  O(1)    in-place    unstable    comparison
 # merge     O(nlogn)    O(nlogn)    O(nlogn)    O(n)    out-place   stable      comparison
+# tim       O(nlogn)    O(n)        O(nlogn)    O(n)    out-place   stable      comparison
 # quick     O(nlogn)    O(nlogn)    O(n^2)      O(logn) in-place    unstable    comparison
+# intro     O(nlogn)    O(nlogn)    O(nlogn)    O(logn) in-place    unstable    comparison
 # heap      O(nlogn)    O(nlogn)    O(nlogn)    O(1)    in-place    unstable    comparison
 # counting  O(n+k)      O(n+k)      O(n+k)      O(k)    out-place   stable      non-comparison
 # bucket    O(n+k)      O(n+k)      O(n^2)      O(n+k)  out-place   stable      non-comparison
 # radix     O(nk)       O(nk)       O(nk)       O(n+k)  out-place   stable      non-comparison
 
-import random
-import time
+import heapq
+import os
+import pickle
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right
 from collections import deque
 from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import ExitStack
+from functools import partial
+from itertools import count, repeat
+from multiprocessing import shared_memory
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+'''
+key and reverse
+decorate-sort-undecorate: every key is computed once, the sort runs on the decorated list, then the elements
+are gathered back in the sorted order. the element index is part of the decoration, so elements themselves
+are never compared and equal keys keep their input order, for every sort, stable or not. reverse sorts the
+index descending too and flips the result, which keeps equal keys in input order like sorted(reverse=True).
+'''
+
+
+# comparison sorts: (key, index) tuples
+def sort_by_key(sort_func, arr, key=None, reverse=False):
+    sign = -1 if reverse else 1
+    keys = arr if key is None else map(key, arr)
+    decorated = [(k, sign * i) for i, k in enumerate(keys)]
+    sort_func(decorated)
+    if reverse:
+        decorated.reverse()
+    values = [arr[sign * i] for _, i in decorated]
+    arr[:] = array(arr.typecode, values) if isinstance(arr, array) else values
+
+
+# integer sorts: key and index packed into one int, (key - min key) * n + index, so the sort still sees
+# plain non-negative ints, whatever the sign of the keys, and no tuple is built per element
+def sort_by_int_key(sort_func, arr, key=None, reverse=False, *args):
+    n = len(arr)
+    keys = list(arr) if key is None else list(map(key, arr))
+    low = min(keys, default=0)
+    packed = [(k - low) * n + (n - 1 - i if reverse else i) for i, k in enumerate(keys)]
+    sort_func(packed, *args)
+    if reverse:
+        order = [n - 1 - p % n for p in reversed(packed)]
+    else:
+        order = [p % n for p in packed]
+    values = [arr[i] for i in order]
+    arr[:] = array(arr.typecode, values) if isinstance(arr, array) else values
 
 '''
 quick sort 
@@ -41,7 +111,9 @@ fastest in large-scale and out-of-order data, divide & conquer
 '''
 
 
-def quick_sort(arr):
+def quick_sort(arr, key=None, reverse=False):
+    if key is not None or reverse:
+        return sort_by_key(quick_sort, arr, key, reverse)
     quick_sort_rec(arr, 0, len(arr) - 1)
 
 
@@ -69,6 +141,149 @@ def partition(arr, lo, hi):
     return lo
 
 
+'''
+intro sort
+avg: O(nlogn), best: O(nlogn), worst: O(nlogn), space: O(logn), in-place, unstable, comparison
+recommended general in-place sort. quick sort with three guards:
+1. median-of-three pivot and a Hoare partition that stops on equal keys, so duplicates split evenly
+2. after 2*log2(n) levels of bad splits the partition goes to heap sort, worst case stays O(nlogn)
+3. partitions below INTRO_SORT_CUTOFF go to insert sort, cheaper than recursing on tiny ranges
+iterative, the larger side is pushed on a stack and the smaller one looped on, stack depth O(logn)
+'''
+INTRO_SORT_CUTOFF = 16
+
+
+def intro_sort(arr, key=None, reverse=False):
+    if key is not None or reverse:
+        return sort_by_key(intro_sort, arr, key, reverse)
+    if len(arr) < 2:
+        return
+    stack = [(0, len(arr) - 1, 2 * len(arr).bit_length())]
+    while stack:
+        lo, hi, depth = stack.pop()
+        while hi - lo >= INTRO_SORT_CUTOFF:
+            if depth == 0:
+                heap_sort_range(arr, lo, hi)
+                break
+            depth -= 1
+            p = hoare_partition(arr, lo, hi)
+            # [lo, p] <= pivot <= [p + 1, hi]
+            if p - lo < hi - p:
+                stack.append((p + 1, hi, depth))
+                hi = p
+            else:
+                stack.append((lo, p, depth))
+                lo = p + 1
+        else:
+            insert_sort_range(arr, lo, hi)
+
+
+def hoare_partition(arr, lo, hi):
+    # sort arr[lo], arr[mid], arr[hi], the median ends up at mid
+    mid = lo + hi >> 1
+    if arr[mid] < arr[lo]:
+        arr[lo], arr[mid] = arr[mid], arr[lo]
+    if arr[hi] < arr[lo]:
+        arr[lo], arr[hi] = arr[hi], arr[lo]
+    if arr[hi] < arr[mid]:
+        arr[mid], arr[hi] = arr[hi], arr[mid]
+    return hoare_split(arr, lo, hi, arr[mid])
+
+
+# returns j with [lo, j] <= x <= [j + 1, hi] and lo <= j < hi, as long as x is arr[lo] or the median of
+# arr[lo], arr[mid], arr[hi]
+def hoare_split(arr, lo, hi, x):
+    i, j = lo - 1, hi + 1
+    while True:
+        i += 1
+        while arr[i] < x:
+            i += 1
+        j -= 1
+        while arr[j] > x:
+            j -= 1
+        if i >= j:
+            return j
+        arr[i], arr[j] = arr[j], arr[i]
+
+
+'''
+selection: nth_element and partial_sort, as in C++
+nth_element(arr, k): arr[k] becomes the element a full sort would put there, with arr[:k] <= arr[k] <= arr[k + 1:]
+partial_sort(arr, k): arr[:k] becomes the k smallest in sorted order, the rest is left in no particular order
+introselect: quickselect on intro sort's median-of-three hoare partition, keeping only the side that holds k.
+after 2*log2(n) rounds it switches to median-of-medians pivots, which always cut off >= 30% of the range,
+so the worst case stays O(n) where plain quickselect is O(n^2).
+nth_element: avg O(n), worst O(n); partial_sort: O(n + klogk); in-place, unstable, comparison
+both work on lists and array.array and take key= and reverse= like the sorts (reverse: the k largest)
+'''
+
+
+def nth_element(arr, k, key=None, reverse=False):
+    n = len(arr)
+    if not 0 <= k < n:
+        raise IndexError("nth_element index {} out of range for length {}".format(k, n))
+    if key is not None or reverse:
+        # a reversed result gets flipped at the end, so select position n - 1 - k before that
+        return sort_by_key(partial(introselect, k=n - 1 - k if reverse else k), arr, key, reverse)
+    introselect(arr, k)
+
+
+def partial_sort(arr, k, key=None, reverse=False):
+    n, k = len(arr), min(k, len(arr))
+    if k <= 0:
+        return
+    if key is not None or reverse:
+        return sort_by_key(partial(sort_smallest, k=k, back=reverse), arr, key, reverse)
+    sort_smallest(arr, k)
+
+
+# the k smallest in sorted order at the front, or with back=True the k largest at the back
+def sort_smallest(arr, k, back=False):
+    n = len(arr)
+    lo, hi = (n - k, n) if back else (0, k)
+    introselect(arr, lo if back else k - 1)
+    part = arr[lo:hi]
+    intro_sort(part)
+    arr[lo:hi] = part
+
+
+# lo, hi (included): only arr[lo..hi] is searched, k must be in it
+def introselect(arr, k, lo=0, hi=None):
+    hi = len(arr) - 1 if hi is None else hi
+    depth = 2 * (hi - lo + 1).bit_length()
+    while hi - lo >= INTRO_SORT_CUTOFF:
+        if depth == 0:
+            m = median_of_medians(arr, lo, hi)
+            arr[lo], arr[m] = arr[m], arr[lo]
+            p = hoare_split(arr, lo, hi, arr[lo])
+        else:
+            depth -= 1
+            p = hoare_partition(arr, lo, hi)
+        if k <= p:
+            hi = p
+        else:
+            lo = p + 1
+    insert_sort_range(arr, lo, hi)
+
+
+# index of a pivot with >= 30% of arr[lo..hi] on either side: the median of the medians of groups of 5,
+# collected at the front of the range and selected recursively
+def median_of_medians(arr, lo, hi):
+    if hi - lo < 5:
+        insert_sort_range(arr, lo, hi)
+        return lo + hi >> 1
+    j = lo
+    for i in range(lo, hi + 1, 5):
+        end = min(i + 4, hi)
+        insert_sort_range(arr, i, end)
+        m = i + end >> 1
+        arr[j], arr[m] = arr[m], arr[j]
+        j += 1
+    mid = lo + (j - 1 - lo) // 2
+    introselect(arr, mid, lo, j - 1)
+    return mid
+
+
 '''
 merge sort
 avg: O(nlogn), best: O(nlogn), worst: O(nlogn), space: O(n), out-place, stable, comparison
@@ -77,7 +292,9 @@ divide & conquer
 
 
 # the version with a fixed temp array
-def merge_sort(arr):
+def merge_sort(arr, key=None, reverse=False):
+    if key is not None or reverse:
+        return sort_by_key(merge_sort, arr, key, reverse)
     merge_sort_rec(arr, 0, len(arr) - 1, [0] * len(arr))
 
 
@@ -116,7 +333,9 @@ def merge(arr, first, mid, last, temp):
         arr[first + i] = temp[i]
 
 
-def merge_sort2(arr):
+def merge_sort2(arr, key=None, reverse=False):
+    if key is not None or reverse:
+        return sort_by_key(merge_sort2, arr, key, reverse)
     res = merge_sort_rec2(arr)
     for i in range(len(arr)):
         arr[i] = res[i]
@@ -175,6 +394,220 @@ def merge3(left, right):
     return (left or right) + res
 
 
+'''
+tim sort, natural merge sort as in CPython's list.sort
+avg: O(nlogn), best: O(n), worst: O(nlogn), space: O(n), out-place, stable, comparison
+fast on partly sorted data, merge_sort always splits down to single elements, tim sort only merges the runs
+that are already there:
+1. detect natural runs, ascending ones or strictly descending ones (reversed in place, strict keeps it stable)
+2. extend short runs to minrun (32~64) with binary insertion sort
+3. keep a stack of runs whose lengths shrink faster than fibonacci, so merges stay balanced
+4. merge by copying only the smaller run to one scratch buffer allocated once per sort
+5. gallop: once one run wins MIN_GALLOP times in a row, find how far it keeps winning by exponential
+   search and move that whole block with one slice assignment
+'''
+MIN_GALLOP = 7
+
+
+def tim_sort(arr, key=None, reverse=False):
+    if key is not None or reverse:
+        return sort_by_key(tim_sort, arr, key, reverse)
+
+    n = len(arr)
+    if n < 2:
+        return
+    # scratch space of the input's own type, array slices only take arrays
+    minrun, temp, runs = compute_minrun(n), arr[:n // 2], []
+    lo = 0
+    while lo < n:
+        run = count_run(arr, lo, n)
+        if run < minrun:
+            force = min(minrun, n - lo)
+            binary_insert_sort(arr, lo, lo + force, lo + run)
+            run = force
+        runs.append((lo, run))
+        merge_collapse(arr, runs, temp)
+        lo += run
+
+    # merge all the rest
+    while len(runs) > 1:
+        i = len(runs) - 2
+        if i > 0 and runs[i - 1][1] < runs[i + 1][1]:
+            i -= 1
+        merge_at(arr, runs, i, temp)
+
+
+# take the 6 most significant bits of n, plus 1 if any of the remaining bits are set
+def compute_minrun(n):
+    r = 0
+    while n >= 64:
+        r |= n & 1
+        n >>= 1
+    return n + r
+
+
+# length of the run starting at lo, a descending run is reversed in place
+def count_run(arr, lo, hi):
+    i = lo + 1
+    if i == hi:
+        return 1
+    if arr[i] < arr[lo]:
+        while i + 1 < hi and arr[i + 1] < arr[i]:
+            i += 1
+        arr[lo:i + 1] = arr[lo:i + 1][::-1]
+    else:
+        while i + 1 < hi and not arr[i + 1] < arr[i]:
+            i += 1
+    return i + 1 - lo
+
+
+# arr[lo:start] is sorted, insert arr[start:hi] one by one, shifting with slice assignment
+def binary_insert_sort(arr, lo, hi, start):
+    for i in range(start, hi):
+        x = arr[i]
+        pos = bisect_right(arr, x, lo, i)
+        arr[pos + 1:i + 1] = arr[pos:i]
+        arr[pos] = x
+
+
+# keep run lengths: runs[i - 2] > runs[i - 1] + runs[i] and runs[i - 1] > runs[i]
+def merge_collapse(arr, runs, temp):
+    while len(runs) > 1:
+        i = len(runs) - 2
+        if (i > 0 and runs[i - 1][1] <= runs[i][1] + runs[i + 1][1]) or \
+                (i > 1 and runs[i - 2][1] <= runs[i - 1][1] + runs[i][1]):
+            if runs[i - 1][1] < runs[i + 1][1]:
+                i -= 1
+        elif runs[i][1] > runs[i + 1][1]:
+            break
+        merge_at(arr, runs, i, temp)
+
+
+def merge_at(arr, runs, i, temp):
+    (base1, len1), (base2, len2) = runs[i], runs[i + 1]
+    runs[i] = (base1, len1 + len2)
+    del runs[i + 1]
+
+    # elements of run1 <= run2[0] are already in place
+    k = gallop_right(arr[base2], arr, base1, base1 + len1)
+    len1 -= k - base1
+    base1 = k
+    if len1 == 0:
+        return
+    # elements of run2 >= run1[-1] are already in place
+    len2 = gallop_left_back(arr[base1 + len1 - 1], arr, base2, base2 + len2) - base2
+    if len2 == 0:
+        return
+    if len1 <= len2:
+        merge_lo(arr, base1, len1, base2, len2, temp)
+    else:
+        merge_hi(arr, base1, len1, base2, len2, temp)
+
+
+# run1 is shorter: copy it out, merge from the left
+def merge_lo(arr, base1, len1, base2, len2, temp):
+    temp[:len1] = arr[base1:base1 + len1]
+    i, end1, j, end2, k = 0, len1, base2, base2 + len2, base1
+    while i < end1 and j < end2:
+        # one pair at a time, until one side wins MIN_GALLOP times in a row
+        wins1 = wins2 = 0
+        while i < end1 and j < end2 and wins1 < MIN_GALLOP and wins2 < MIN_GALLOP:
+            if arr[j] < temp[i]:
+                arr[k] = arr[j]
+                j += 1
+                wins1, wins2 = 0, wins2 + 1
+            else:
+                arr[k] = temp[i]
+                i += 1
+                wins1, wins2 = wins1 + 1, 0
+            k += 1
+        # galloping, until both blocks are short again
+        while i < end1 and j < end2:
+            t = gallop_right(arr[j], temp, i, end1)
+            arr[k:k + t - i] = temp[i:t]
+            k, n1, i = k + t - i, t - i, t
+            if i == end1:
+                break
+            t = gallop_left(temp[i], arr, j, end2)
+            arr[k:k + t - j] = arr[j:t]
+            k, n2, j = k + t - j, t - j, t
+            if n1 < MIN_GALLOP and n2 < MIN_GALLOP:
+                break
+    # the rest of run2 is already in place
+    arr[k:k + end1 - i] = temp[i:end1]
+
+
+# run2 is shorter: copy it out, merge from the right
+def merge_hi(arr, base1, len1, base2, len2, temp):
+    temp[:len2] = arr[base2:base2 + len2]
+    i, j, k = base1 + len1 - 1, len2 - 1, base2 + len2 - 1
+    while i >= base1 and j >= 0:
+        wins1 = wins2 = 0
+        while i >= base1 and j >= 0 and wins1 < MIN_GALLOP and wins2 < MIN_GALLOP:
+            if temp[j] < arr[i]:
+                arr[k] = arr[i]
+                i -= 1
+                wins1, wins2 = wins1 + 1, 0
+            else:
+                arr[k] = temp[j]
+                j -= 1
+                wins1, wins2 = 0, wins2 + 1
+            k -= 1
+        while i >= base1 and j >= 0:
+            # elements of run1 > temp[j] go right
+            t = gallop_right_back(temp[j], arr, base1, i + 1)
+            n1 = i + 1 - t
+            arr[k - n1 + 1:k + 1] = arr[t:i + 1]
+            k, i = k - n1, t - 1
+            if i < base1:
+                break
+            # elements of temp >= arr[i] go right
+            t = gallop_left_back(arr[i], temp, 0, j + 1)
+            n2 = j + 1 - t
+            arr[k - n2 + 1:k + 1] = temp[t:j + 1]
+            k, j = k - n2, t - 1
+            if n1 < MIN_GALLOP and n2 < MIN_GALLOP:
+                break
+    # the rest of run1 is already in place
+    arr[base1:base1 + j + 1] = temp[:j + 1]
+
+
+# gallop: probe a[lo], a[lo + 1], a[lo + 3], a[lo + 7], ... then binary search the last gap
+# first index i in [lo, hi] with x < a[i]
+def gallop_right(x, a, lo, hi):
+    left, ofs = lo, 1
+    while lo + ofs - 1 < hi and not x < a[lo + ofs - 1]:
+        left = lo + ofs
+        ofs <<= 1
+    return bisect_right(a, x, left, min(lo + ofs - 1, hi))
+
+
+# first index i in [lo, hi] with x <= a[i]
+def gallop_left(x, a, lo, hi):
+    left, ofs = lo, 1
+    while lo + ofs - 1 < hi and a[lo + ofs - 1] < x:
+        left = lo + ofs
+        ofs <<= 1
+    return bisect_left(a, x, left, min(lo + ofs - 1, hi))
+
+
+# same searches, probing backwards from hi - 1
+def gallop_right_back(x, a, lo, hi):
+    right, ofs = hi, 1
+    while hi - ofs >= lo and x < a[hi - ofs]:
+        right = hi - ofs
+        ofs <<= 1
+    return bisect_right(a, x, max(hi - ofs + 1, lo), right)
+
+
+def gallop_left_back(x, a, lo, hi):
+    right, ofs = hi, 1
+    while hi - ofs >= lo and not a[hi - ofs] < x:
+        right = hi - ofs
+        ofs <<= 1
+    return bisect_left(a, x, max(hi - ofs + 1, lo), right)
+
+
 '''
 insert sort
 avg: O(n^2), best: O(n), worst: O(n^2), space: O(1), in-place, stable, comparison
@@ -182,11 +615,18 @@ fast in small-scale and almost sorted data
 '''
 
 
-def insert_sort(arr):
-    for i in range(1, len(arr)):
+def insert_sort(arr, key=None, reverse=False):
+    if key is not None or reverse:
+        return sort_by_key(insert_sort, arr, key, reverse)
+    insert_sort_range(arr, 0, len(arr) - 1)
+
+
+# sort arr[lo..hi] in place, for the small ranges of intro_sort and introselect
+def insert_sort_range(arr, lo, hi):
+    for i in range(lo + 1, hi + 1):
         x = arr[i]
         j = i - 1
-        while j >= 0 and arr[j] > x:
+        while j >= lo and arr[j] > x:
             arr[j + 1] = arr[j]
             j = j - 1
         arr[j + 1] = x
@@ -202,7 +642,9 @@ optimization:
 
 
 # bubble the max to right most
-def bubble_sort(arr):
+def bubble_sort(arr, key=None, reverse=False):
+    if key is not None or reverse:
+        return sort_by_key(bubble_sort, arr, key, reverse)
     for i in range(len(arr) - 1):
         for j in range(len(arr) - i - 1):
             if arr[j] > arr[j + 1]:
@@ -210,7 +652,9 @@ def bubble_sort(arr):
 
 
 # optimization
-def bubble_sort2(arr):
+def bubble_sort2(arr, key=None, reverse=False):
+    if key is not None or reverse:
+        return sort_by_key(bubble_sort2, arr, key, reverse)
     i = len(arr) - 1
     while i > 0:
         last_swap = 0
@@ -230,7 +674,9 @@ most stable in time cost, always O(n^2), and easy understanding, used in small s
 '''
 
 
-def selection_sort(arr):
+def selection_sort(arr, key=None, reverse=False):
+    if key is not None or reverse:
+        return sort_by_key(selection_sort, arr, key, reverse)
     for i in range(len(arr)):
         min_i = i
         for j in range(i+1, len(arr)):
@@ -246,31 +692,39 @@ not only a sort algorithm, this structure (priority queue) can do more thing.
 '''
 
 
-def heap_sort(arr):
+def heap_sort(arr, key=None, reverse=False):
+    if key is not None or reverse:
+        return sort_by_key(heap_sort, arr, key, reverse)
+    heap_sort_range(arr, 0, len(arr) - 1)
+
+
+# sort arr[lo..hi] in place, the heap is laid out from arr[lo]
+def heap_sort_range(arr, lo, hi):
+    n = hi + 1 - lo
     # build max heap
-    for i in range(len(arr) // 2)[::-1]:
-        heap_adjust(arr, i, len(arr))
+    for i in range(n // 2)[::-1]:
+        heap_adjust(arr, i, n, lo)
 
     # adjust from last element
-    for i in range(1, len(arr))[::-1]:
+    for i in range(1, n)[::-1]:
         # swap first with the last, make the right most is maximum
-        arr[0], arr[i] = arr[i], arr[0]
-        heap_adjust(arr, 0, i)
+        arr[lo], arr[lo + i] = arr[lo + i], arr[lo]
+        heap_adjust(arr, 0, i, lo)
 
 
-def heap_adjust(arr, i, n):
-    cur = arr[i]
+def heap_adjust(arr, i, n, lo=0):
+    cur = arr[lo + i]
     while 2 * i + 1 < n:
         # get child index in heap
         child = 2 * i + 1
 
         # choose the larger child
-        if child < n - 1 and arr[child + 1] > arr[child]:
+        if child < n - 1 and arr[lo + child + 1] > arr[lo + child]:
             child += 1
 
         # if child is larger than parent, sift up
-        if cur < arr[child]:
-            arr[i], arr[child] = arr[child], cur
+        if cur < arr[lo + child]:
+            arr[lo + i], arr[lo + child] = arr[lo + child], cur
             i = child
         else:
             break
@@ -283,8 +737,10 @@ improvement of insertion sort
 '''
 
 
-def shell_sort(arr):
+def shell_sort(arr, key=None, reverse=False):
     # Shell sort using Shell's (original) gap sequence: n/2, n/4, ..., 1.
+    if key is not None or reverse:
+        return sort_by_key(shell_sort, arr, key, reverse)
     gap = len(arr) // 2
     # loop over the gaps
     while gap > 0:
@@ -306,7 +762,11 @@ relatively concentrated values
 '''
 
 
-def counting_sort(arr):
+def counting_sort(arr, key=None, reverse=False):
+    if len(arr) < 2:
+        return
+    if key is not None or reverse:
+        return counting_sort_by_key(arr, key, reverse)
     min_val, max_val = min(arr), max(arr)
     size = max_val - min_val + 1
     counter = [0] * size
@@ -321,6 +781,26 @@ def counting_sort(arr):
         idx += v
 
 
+# the stable textbook version: prefix sums of the counters give where each key starts, the elements are
+# then placed in input order
+def counting_sort_by_key(arr, key=None, reverse=False):
+    keys = list(arr) if key is None else [key(x) for x in arr]
+    min_val, max_val = min(keys), max(keys)
+    counter = [0] * (max_val - min_val + 1)
+    for k in keys:
+        counter[k - min_val] += 1
+
+    start = 0
+    for i in (reversed(range(len(counter))) if reverse else range(len(counter))):
+        counter[i], start = start, start + counter[i]
+
+    res = [None] * len(arr)
+    for x, k in zip(arr, keys):
+        res[counter[k - min_val]] = x
+        counter[k - min_val] += 1
+    arr[:] = res
+
+
 '''
 bucket sort
 avg: O(n+k), best:O(n+k), worst:O(n^2), space:O(n+k), out-place, stable, non-comparison
@@ -329,7 +809,12 @@ improvement of counting sort, usually used with hash
 DEFAULT_BUCKET_SIZE = 5
 
 
-def bucket_sort(arr, size=DEFAULT_BUCKET_SIZE):
+def bucket_sort(arr, size=DEFAULT_BUCKET_SIZE, key=None, reverse=False):
+    if key is not None or reverse:
+        # packed values are n times larger, so are the buckets
+        return sort_by_int_key(bucket_sort, arr, key, reverse, size * len(arr))
+    if len(arr) < 2:
+        return
     min_val, max_val = min(arr), max(arr)
 
     # initialize buckets
@@ -350,7 +835,11 @@ def bucket_sort(arr, size=DEFAULT_BUCKET_SIZE):
 
 
 # with hash
-def bucket_sort2(arr):
+def bucket_sort2(arr, key=None, reverse=False):
+    if key is not None or reverse:
+        return sort_by_int_key(bucket_sort2, arr, key, reverse)
+    if len(arr) < 2:
+        return
     # get hash codes
     code = hashing(arr)
     buckets = [[] for _ in range(code[1])]
@@ -382,7 +871,9 @@ improvement of counting sort
 '''
 
 
-def radix_sort(arr):
+def radix_sort(arr, key=None, reverse=False):
+    if key is not None or reverse:
+        return sort_by_int_key(radix_sort, arr, key, reverse)
     radix = 10
     max_length = False
     placement = 1
@@ -399,10 +890,9 @@ def radix_sort(arr):
             if max_length and temp > 0:
                 max_length = False
 
-        # assign from bucket to arr
+        # assign from bucket to arr, buckets are filled in order so no sort is needed inside them
         i = 0
         for bucket in buckets:
-            insert_sort(bucket)
             # use slice assignment
             arr[i:i + len(bucket)] = bucket
             i += len(bucket)
@@ -412,6 +902,334 @@ def radix_sort(arr):
     return arr
 
 
+'''
+numpy versions of counting, radix and bucket sort
+same ideas as above, but each pass over the data is one vectorized numpy call instead of a python loop.
+they sort in place a list, an array.array (through a zero-copy view of its buffer) or a numpy ndarray.
+without numpy installed they fall back to the pure python versions (ndarray input needs numpy anyway).
+with key or reverse all three order the compact key array with numpy's stable argsort instead (a radix sort
+for keys up to 16 bits, timsort above) and gather the elements.
+'''
+
+
+def as_ndarray(arr):
+    if isinstance(arr, array):
+        return np.frombuffer(arr, dtype=arr.typecode) if len(arr) else np.array([], dtype=arr.typecode)
+    return np.asarray(arr)
+
+
+def write_back(arr, values):
+    if isinstance(arr, list):
+        arr[:] = values.tolist()
+    elif isinstance(arr, array):
+        np.frombuffer(arr, dtype=arr.typecode)[:] = values
+    else:
+        arr[:] = values
+
+
+# run a list-only pure python sort on a list or array.array
+def sort_as_list(sort_func, arr):
+    if isinstance(arr, list):
+        sort_func(arr)
+    else:
+        values = list(arr)
+        sort_func(values)
+        arr[:] = array(arr.typecode, values)
+
+
+# bincount gives the counter, repeat writes every value count times
+def counting_sort_np(arr, key=None, reverse=False):
+    if len(arr) < 2:
+        return
+    if np is None:
+        return sort_as_list(partial(counting_sort, key=key, reverse=reverse), arr)
+    if key is not None or reverse:
+        return sort_np_by_key(arr, key, reverse)
+    a = as_ndarray(arr)
+    if a.dtype.kind not in 'iu':
+        raise TypeError("counting sort needs integers, got {}".format(a.dtype))
+    # offsets in a 64-bit type, hi - lo overflows narrow ones like int8
+    wide = np.uint64 if a.dtype.kind == 'u' else np.int64
+    lo, hi = int(a.min()), int(a.max())
+    counts = np.bincount((a.astype(wide) - wide(lo)).astype(np.intp), minlength=hi - lo + 1)
+    values = np.arange(hi - lo + 1, dtype=wide) + wide(lo)
+    write_back(arr, np.repeat(values, counts).astype(a.dtype))
+
+
+# radix sort on int64 keys, 16 bits per pass, low digits first.
+# flipping the sign bit maps signed order onto unsigned order, so negatives need no special case.
+# the stable argsort of a uint16 digit is numpy's radix (counting) sort, so each pass is O(n).
+# digits that are the same for every element are skipped, small ranges take 1 or 2 passes.
+def radix_sort_np(arr, key=None, reverse=False):
+    if len(arr) < 2:
+        return
+    if np is None:
+        return sort_as_list(partial(signed_radix_sort, key=key, reverse=reverse), arr)
+    if key is not None or reverse:
+        return sort_np_by_key(arr, key, reverse)
+    a = as_ndarray(arr)
+    if a.dtype.kind not in 'iu':
+        if a.dtype == object:
+            # python ints beyond 64 bits
+            return sort_as_list(signed_radix_sort, arr)
+        raise TypeError("radix sort needs integers, got {}".format(a.dtype))
+    sign = np.uint64(0 if a.dtype.kind == 'u' else 1 << 63)
+    keys = a.astype(np.int64 if sign else np.uint64).view(np.uint64) ^ sign
+    for shift in range(0, 64, 16):
+        digit = (keys >> np.uint64(shift)).astype(np.uint16)
+        if digit.min() == digit.max():
+            continue
+        keys = keys[np.argsort(digit, kind='stable')]
+    write_back(arr, (keys ^ sign).view(np.int64 if sign else np.uint64).astype(a.dtype))
+
+
+# pure python fallback: radix_sort only handles non-negative ints, sort negatives by magnitude separately
+def signed_radix_sort(arr, key=None, reverse=False):
+    if key is not None or reverse:
+        return sort_by_int_key(signed_radix_sort, arr, key, reverse)
+    negative = [-x for x in arr if x < 0]
+    rest = [x for x in arr if x >= 0]
+    radix_sort(negative)
+    radix_sort(rest)
+    arr[:] = [-x for x in reversed(negative)] + rest
+
+
+# ints or floats: ~sqrt(n) equal-width buckets, elements grouped by bucket with a counting sort of their
+# bucket ids, then every bucket sorted by one np.sort call on its segment
+def bucket_sort_np(arr, key=None, reverse=False):
+    if len(arr) < 2:
+        return
+    if np is None:
+        return sort_as_list(partial(bucket_sort, key=key, reverse=reverse), arr)
+    if key is not None or reverse:
+        return sort_np_by_key(arr, key, reverse)
+    a = as_ndarray(arr)
+    lo, hi = a.min(), a.max()
+    if lo == hi:
+        return
+    count = max(int(len(a) ** 0.5), 1)
+    # in float64, a - lo overflows narrow int types
+    ids = ((a.astype(np.float64) - float(lo)) / (float(hi) - float(lo)) * (count - 1)).astype(np.intp)
+    grouped = a[np.argsort(ids, kind='stable')]
+    ends = np.cumsum(np.bincount(ids, minlength=count))
+    start = 0
+    for end in ends.tolist():
+        if end - start > 1:
+            grouped[start:end] = np.sort(grouped[start:end], kind='stable')
+        start = end
+    write_back(arr, grouped)
+
+
+def sort_np_by_key(arr, key=None, reverse=False):
+    keys = as_ndarray(arr) if key is None else np.array([key(x) for x in arr])
+    if reverse:
+        # stable descending: sort the reversed keys, flip, and map back to input positions
+        order = len(keys) - 1 - np.argsort(keys[::-1], kind='stable')[::-1]
+    else:
+        order = np.argsort(keys, kind='stable')
+    if isinstance(arr, list):
+        arr[:] = [arr[i] for i in order.tolist()]
+    else:
+        write_back(arr, as_ndarray(arr)[order])
+
+
+'''
+external merge sort
+for data larger than memory: records are the lines of a text file, compared and keyed without the newline.
+read chunks that fit a memory budget, sort each chunk in memory with an in-place sort above and spill it to a
+temp file as a sorted run, then k-way merge the runs with heapq.merge. at most EXTERNAL_FAN_IN runs are merged
+at once to bound the open files, so more runs take extra merge passes. stable: runs keep file order and heapq.merge prefers the earlier run on ties.
+with workers > 1 a process pool sorts and writes runs while the next chunk is read. key and sort_func are then
+pickled to the workers, so they must be module-level functions; a lambda or closure falls back to workers=1.
+io: O(n * (1 + log_k(n/m))) for memory m and fan-in k, usually 2 passes over the data
+'''
+EXTERNAL_MEMORY = 64 * 1024 * 1024
+EXTERNAL_FAN_IN = 64
+
+
+# sort_func is any xxx_sort above, tim_sort by default
+def external_sort(input_path, output_path, key=None, reverse=False, memory=EXTERNAL_MEMORY, workers=1,
+                  sort_func=None, tmp_dir=None, encoding='utf-8'):
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as tmp:
+        paths = (os.path.join(tmp, 'run{}'.format(i)) for i in count())
+        runs = make_runs(input_path, paths, key, reverse, memory, workers, sort_func, encoding)
+        while len(runs) > EXTERNAL_FAN_IN:
+            runs = [merge_runs(runs[i:i + EXTERNAL_FAN_IN], next(paths), key, reverse, encoding)
+                    for i in range(0, len(runs), EXTERNAL_FAN_IN)]
+        merge_runs(runs, output_path, key, reverse, encoding)
+
+
+# lines without their newline, so '\n' neither takes part in comparisons nor reaches the key:
+# 'abc' sorts before 'abc\tx' as in sorted(), though 'abc\n' > 'abc\tx'
+def read_records(f):
+    for line in f:
+        yield line[:-1] if line.endswith('\n') else line
+
+
+# lists of records whose estimated in-memory size stays under memory
+def read_chunks(path, memory, encoding='utf-8'):
+    chunk, size = [], 0
+    with open(path, encoding=encoding) as f:
+        for line in read_records(f):
+            chunk.append(line)
+            # the string plus its list slot
+            size += sys.getsizeof(line) + 8
+            if size >= memory:
+                yield chunk
+                chunk, size = [], 0
+    if chunk:
+        yield chunk
+
+
+# also the process pool task, so the chunk is sorted and written in the worker
+def write_run(lines, path, key=None, reverse=False, sort_func=None, encoding='utf-8'):
+    (sort_func or tim_sort)(lines, key=key, reverse=reverse)
+    with open(path, 'w', encoding=encoding) as f:
+        f.writelines(line + '\n' for line in lines)
+    return path
+
+
+def make_runs(input_path, paths, key, reverse, memory, workers, sort_func, encoding):
+    if workers <= 1 or not picklable(key, sort_func):
+        return [write_run(chunk, next(paths), key, reverse, sort_func, encoding)
+                for chunk in read_chunks(input_path, memory, encoding)]
+    # the reader holds one chunk and each worker at most one, so the budget is split between them
+    futures = []
+    with ProcessPoolExecutor(workers) as executor:
+        pending = set()
+        for chunk in read_chunks(input_path, memory // (workers + 1), encoding):
+            if len(pending) >= workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            future = executor.submit(write_run, chunk, next(paths), key, reverse, sort_func, encoding)
+            futures.append(future)
+            pending.add(future)
+        # in chunk order, which keeps the merge stable
+        return [future.result() for future in futures]
+
+
+# lambdas and nested functions cannot be sent to a process pool
+def picklable(*objs):
+    try:
+        pickle.dumps(objs)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    return True
+
+
+def merge_runs(runs, output_path, key=None, reverse=False, encoding='utf-8'):
+    with ExitStack() as stack:
+        files = [read_records(stack.enter_context(open(run, encoding=encoding))) for run in runs]
+        with open(output_path, 'w', encoding=encoding) as out:
+            out.writelines(line + '\n' for line in heapq.merge(*files, key=key, reverse=reverse))
+    for run in runs:
+        os.remove(run)
+    return output_path
+
+
+'''
+parallel merge sort
+sorts an array.array, or a list of int64 ints or of floats, with worker processes over shared memory (PSRS,
+parallel sorting by regular sampling):
+1. the data is copied into a shared block and each of p workers sorts one contiguous chunk with sort_func
+2. p regular samples of every sorted chunk give p-1 splitters, bisect cuts every chunk at the splitters
+3. worker k merges the k-th slice of all chunks with heapq.merge into its own range of a second shared block
+only offsets travel to the workers, never the elements. each merge range holds < 2n/p elements unless
+there are many duplicates of a splitter.
+avg: O(nlogn / p), space: O(n) shared, falls back to sort_func below PARALLEL_MIN_SIZE elements
+and for lists that do not fit one typecode exactly
+'''
+PARALLEL_MIN_SIZE = 50_000
+
+
+def parallel_merge_sort(arr, workers=None, sort_func=None, key=None, reverse=False):
+    sort_func = sort_func or tim_sort
+    n, workers = len(arr), workers or os.cpu_count() or 1
+    if n < PARALLEL_MIN_SIZE or workers < 2 or key is not None:
+        # decorated (key, index) pairs do not fit a flat shared buffer, keyed sorts run sequentially
+        return sort_as_list(partial(sort_func, key=key, reverse=reverse), arr)
+    if isinstance(arr, array):
+        values = arr
+    else:
+        typecode = list_typecode(arr)
+        if typecode is None:
+            return sort_as_list(partial(sort_func, reverse=reverse), arr)
+        values = array(typecode, arr)
+    typecode = values.typecode
+    nbytes = n * array(typecode).itemsize
+    src = shared_memory.SharedMemory(create=True, size=nbytes)
+    dst = shared_memory.SharedMemory(create=True, size=nbytes)
+    try:
+        with src.buf[:nbytes] as raw, raw.cast(typecode) as view:
+            view[:] = memoryview(values)
+            bounds = [n * i // workers for i in range(workers + 1)]
+            with ProcessPoolExecutor(workers) as executor:
+                samples = executor.map(sort_shared_chunk, repeat(src.name), repeat(typecode), repeat(n),
+                                       bounds, bounds[1:], repeat(sort_func), repeat(workers))
+                samples = sorted(x for chunk in samples for x in chunk)
+                splitters = samples[workers + workers // 2 - 1::workers][:workers - 1]
+                # cuts[c][k]: where the k-th merge range starts in chunk c
+                cuts = [[lo] + [bisect_left(view, x, lo, hi) for x in splitters] + [hi]
+                        for lo, hi in zip(bounds, bounds[1:])]
+                tasks, offset = [], 0
+                for k in range(workers):
+                    segments = [(cut[k], cut[k + 1]) for cut in cuts]
+                    tasks.append((offset, segments))
+                    offset += sum(hi - lo for lo, hi in segments)
+                list(executor.map(merge_shared_segments, repeat(src.name), repeat(dst.name), repeat(typecode),
+                                  repeat(n), *zip(*tasks)))
+        with dst.buf[:nbytes] as raw, raw.cast(typecode) as view:
+            if isinstance(arr, array):
+                memoryview(arr)[:] = view
+            else:
+                arr[:] = view.tolist()
+        if reverse:
+            # equal numbers are interchangeable, flipping the ascending order is enough
+            arr.reverse()
+    finally:
+        for block in (src, dst):
+            block.close()
+            block.unlink()
+
+
+# 'q' if every element is an int that fits int64, 'd' if every element is a float, else None:
+# anything else would come back changed from the shared buffer (big ints, bools, mixed ints and floats)
+def list_typecode(arr):
+    if all(type(x) is int for x in arr):
+        return 'q' if -(1 << 63) <= min(arr) and max(arr) < 1 << 63 else None
+    if all(type(x) is float for x in arr):
+        return 'd'
+    return None
+
+
+# worker task: sort view[lo:hi] in place, return workers regular samples of it
+def sort_shared_chunk(name, typecode, n, lo, hi, sort_func, workers):
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        with block.buf[:n * array(typecode).itemsize] as raw, raw.cast(typecode) as view:
+            chunk = view[lo:hi].tolist()
+            sort_func(chunk)
+            view[lo:hi] = array(typecode, chunk)
+    finally:
+        block.close()
+    return [chunk[i * len(chunk) // workers] for i in range(workers)] if chunk else []
+
+
+# worker task: merge the sorted src segments into dst[offset:]
+def merge_shared_segments(src_name, dst_name, typecode, n, offset, segments):
+    src, dst = shared_memory.SharedMemory(name=src_name), shared_memory.SharedMemory(name=dst_name)
+    nbytes = n * array(typecode).itemsize
+    try:
+        with src.buf[:nbytes] as raw, raw.cast(typecode) as view:
+            merged = array(typecode, heapq.merge(*(view[lo:hi].tolist() for lo, hi in segments)))
+        with dst.buf[:nbytes] as raw, raw.cast(typecode) as view:
+            view[offset:offset + len(merged)] = merged
+    finally:
+        src.close()
+        dst.close()
+
+
 '''
 topological sort
 in a directed graph, a linear ordering of its vertices such that for every directed edge uv from vertex u to vertex v, 
@@ -421,58 +1239,172 @@ u comes before v in the ordering.
 GRAY, BLACK = 0, 1
 
 
+# dfs version, iterative: an explicit stack of (node, successor iterator), no recursion limit
 def topological_sort(graph):
     order, enter, state = deque(), set(graph), {}
 
-    def dfs(node):
-        state[node] = GRAY
-        for k in graph.get(node, ()):
-            sk = state.get(k, None)
-            if sk == GRAY:
-                raise ValueError("cycle")
-            if sk == BLACK:
-                continue
-            enter.discard(k)
-            dfs(k)
-        order.appendleft(node)
-        state[node] = BLACK
-
     while enter:
-        dfs(enter.pop())
+        start = enter.pop()
+        state[start] = GRAY
+        stack = [(start, iter(graph.get(start, ())))]
+        while stack:
+            node, successors = stack[-1]
+            for k in successors:
+                sk = state.get(k, None)
+                if sk == GRAY:
+                    path = [n for n, _ in stack]
+                    raise ValueError("cycle: " + " -> ".join(map(str, path[path.index(k):] + [k])))
+                if sk == BLACK:
+                    continue
+                enter.discard(k)
+                state[k] = GRAY
+                stack.append((k, iter(graph.get(k, ()))))
+                break
+            else:
+                # all successors done
+                stack.pop()
+                order.appendleft(node)
+                state[node] = BLACK
     return order
 
 
+# kahn version, returns a list of "waves": all nodes whose in-degree drops to zero together.
+# nodes in one wave do not depend on each other, so a scheduler can run a whole wave concurrently.
+# every wave is built before returning, so a cycle raises before any node is handed out.
+def topological_waves(graph):
+    in_degree = {}
+    for node in graph:
+        in_degree.setdefault(node, 0)
+        for k in graph[node]:
+            in_degree[k] = in_degree.get(k, 0) + 1
+
+    waves, wave, emitted = [], [node for node, d in in_degree.items() if d == 0], 0
+    while wave:
+        waves.append(wave)
+        emitted += len(wave)
+        next_wave = []
+        for node in wave:
+            for k in graph.get(node, ()):
+                in_degree[k] -= 1
+                if in_degree[k] == 0:
+                    next_wave.append(k)
+        wave = next_wave
+
+    if emitted < len(in_degree):
+        remaining = {node for node, d in in_degree.items() if d > 0}
+        raise ValueError("cycle: {} ({} nodes can not be ordered)".format(
+            " -> ".join(map(str, find_cycle(graph, remaining))), len(remaining)))
+    return waves
+
+
+def topological_sort_kahn(graph):
+    return [node for wave in topological_waves(graph) for node in wave]
+
+
+# nodes left by kahn all still have an unprocessed predecessor, so walking predecessors must repeat a node
+def find_cycle(graph, remaining):
+    pred = {}
+    for node in remaining:
+        for k in graph.get(node, ()):
+            if k in remaining:
+                pred.setdefault(k, node)
+
+    node, path, seen = next(iter(remaining)), [], {}
+    while node not in seen:
+        seen[node] = len(path)
+        path.append(node)
+        node = pred[node]
+    cycle = path[seen[node]:][::-1]
+    return cycle + [cycle[0]]
+
+
+# incremental version (Pearce-Kelly), keeps a valid order while edges are added one by one.
+# adding u -> v with u already before v costs O(1); otherwise only the nodes positioned between v and u
+# that are reachable forward from v or backward from u get reordered, instead of a full re-sort.
+class IncrementalTopologicalOrder:
+    def __init__(self, graph=None):
+        self.succ, self.pred = defaultdict(set), defaultdict(set)
+        self.pos = {}  # node -> position
+        self.nodes = []  # position -> node
+        for node in graph or ():
+            self.add_node(node)
+            for k in graph[node]:
+                self.add_edge(node, k)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def order(self):
+        return list(self.nodes)
+
+    def add_node(self, node):
+        if node not in self.pos:
+            self.pos[node] = len(self.nodes)
+            self.nodes.append(node)
+
+    def add_edge(self, u, v):
+        self.add_node(u)
+        self.add_node(v)
+        if v in self.succ[u]:
+            return
+        lo, hi = self.pos[v], self.pos[u]
+        if lo <= hi:
+            forward = self._reach(v, self.succ, lambda p: p <= hi)
+            if u in forward:
+                raise ValueError("cycle: edge {} -> {} closes a cycle".format(u, v))
+            backward = self._reach(u, self.pred, lambda p: p >= lo)
+            self._reorder(backward, forward)
+        self.succ[u].add(v)
+        self.pred[v].add(u)
+
+    # iterative dfs from start along edges, only through nodes whose position passes keep
+    def _reach(self, start, edges, keep):
+        seen, stack = {start}, [start]
+        while stack:
+            for k in edges[stack.pop()]:
+                if k not in seen and keep(self.pos[k]):
+                    seen.add(k)
+                    stack.append(k)
+        return seen
+
+    # the affected nodes take over their own positions: everything that reaches u first, then what v reaches
+    def _reorder(self, backward, forward):
+        key = self.pos.__getitem__
+        moved = sorted(backward, key=key) + sorted(forward, key=key)
+        slots = sorted(map(key, moved))
+        for node, p in zip(moved, slots):
+            self.pos[node] = p
+            self.nodes[p] = node
+
+
+# run from the repo root: python -m algorithms.sort
+# full benchmark suite (sizes, distributions, dtypes, JSON output): python -m algorithms.sort_benchmark --help
 if __name__ == '__main__':
-    def sort_test(sort_func):
-        start = time.time()
-        for _ in range(100):
-            nums = [random.randrange(1, 250) for _ in range(1000)]
-            nums1 = sorted(nums)
-            sort_func(nums)
-            if nums1 != nums:
-                print('incorrect', )
-        end = time.time()
-        print('{:15s} time: {}'.format(sort_func.__name__, end - start))
-
-
-    sort_test(quick_sort)
-    sort_test(merge_sort)
-    sort_test(merge_sort2)
-    sort_test(heap_sort)
-    sort_test(shell_sort)
-    sort_test(counting_sort)
-    sort_test(bucket_sort)
-    sort_test(bucket_sort2)
-    sort_test(radix_sort)
-
-    # put turtle algorithms to the tail
-    sort_test(insert_sort)
-    sort_test(bubble_sort)
-    sort_test(bubble_sort2)
-    sort_test(selection_sort)
+    from algorithms import sort_benchmark
+
+    # quick smoke run of every sort
+    sort_benchmark.main(['--sizes', '1000', '--distributions', 'random', '--dtypes', 'int', '--repeat', '3'])
+    # key=, reverse= and stability of every sort
+    sort_benchmark.check(sorted(sort_benchmark.SORTS), sizes=(0, 1, 2, 10, 100))
+
+    # external sort of a file ~40x the memory budget (one run per budget, then a single merge)
+    import random
+    import time
+    with tempfile.TemporaryDirectory() as tmp:
+        source, target = os.path.join(tmp, 'in.txt'), os.path.join(tmp, 'out.txt')
+        lines = ['{:08d}\n'.format(random.randrange(10 ** 8)) for _ in range(200_000)]
+        with open(source, 'w') as f:
+            f.writelines(lines)
+        for workers in (1, 4):
+            start = time.perf_counter()
+            external_sort(source, target, memory=300_000, workers=workers)
+            with open(target) as f:
+                assert f.readlines() == sorted(lines)
+            print('external_sort workers={}: {:.3f}s'.format(workers, time.perf_counter() - start))
 
     graph = defaultdict(list)
     graph['A'].append('B')
     graph['B'].append('D')
     graph['C'].append('A')
     print(topological_sort(graph))
+    print(topological_waves(graph))
@@ -0,0 +1,361 @@
+# benchmark suite for the xxx_sort(arr) functions in sort.py
+# run from the repo root: python -m algorithms.sort_benchmark --help
+#
+# every sort runs over sizes x distributions x dtypes. each case gets warmup runs, then repeated timed runs
+# with time.perf_counter on a fresh copy of the same input (copying is not timed), and the output is checked
+# against sorted(). results print as a table and can be saved as JSON, then compared with an older JSON
+# (--compare) to spot regressions between versions.
+#
+# sorts are pluggable: register(name, func) adds any in-place arr -> None sort to SORTS.
+#
+# --check runs property checks instead of timings: key= and reverse= against sorted(), and stability.
+
+import argparse
+import heapq
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from functools import partial, total_ordering
+
+from algorithms import sort
+
+# name -> (func, dtypes it can handle, max size it is run at)
+SORTS = {}
+
+DTYPES = ('int', 'float', 'str')
+DISTRIBUTIONS = ('random', 'sorted', 'reversed', 'few_unique', 'sawtooth', 'nearly_sorted')
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+# quadratic sorts are capped, a 1e5 bubble sort takes hours in python
+QUADRATIC = {'insert_sort', 'bubble_sort', 'bubble_sort2', 'selection_sort'}
+# non-comparison sorts only work on ints (the pure python ones on non-negative ints)
+INT_ONLY = {'counting_sort', 'bucket_sort', 'bucket_sort2', 'radix_sort', 'counting_sort_np', 'radix_sort_np'}
+# the numpy bucket sort also takes floats
+NUMERIC_ONLY = {'bucket_sort_np'}
+# not xxx_sort(arr) sorts
+NOT_ARRAY_SORTS = {'external_sort', 'partial_sort'}
+# stable in the sort.py header, checked on elements that compare equal without being the same
+STABLE = {'merge_sort', 'merge_sort2', 'tim_sort', 'insert_sort', 'bubble_sort', 'bubble_sort2'}
+# what parallel_merge_sort is measured against in --scaling
+SEQUENTIAL_BASELINES = ('tim_sort', 'intro_sort', 'merge_sort')
+
+
+def register(name, func, dtypes=DTYPES, max_size=None):
+    SORTS[name] = (func, tuple(dtypes), max_size)
+
+
+def register_module_sorts(module):
+    for name in dir(module):
+        func = getattr(module, name)
+        if callable(func) and re.fullmatch(r'[a-z]+_sort\d*(_np)?', name) \
+                and not name.startswith('topological') and name not in NOT_ARRAY_SORTS:
+            dtypes = ('int',) if name in INT_ONLY else ('int', 'float') if name in NUMERIC_ONLY else DTYPES
+            register(name, func, dtypes, 10_000 if name in QUADRATIC else None)
+
+
+register_module_sorts(sort)
+register('parallel_merge_sort', sort.parallel_merge_sort, ('int', 'float'))
+
+
+'''
+input generation, deterministic per (distribution, dtype, size, seed)
+'''
+
+
+def ints(distribution, n, rng):
+    if distribution == 'random':
+        return [rng.randrange(n) for _ in range(n)]
+    if distribution == 'sorted':
+        return list(range(n))
+    if distribution == 'reversed':
+        return list(range(n))[::-1]
+    if distribution == 'few_unique':
+        return [rng.randrange(8) for _ in range(n)]
+    if distribution == 'sawtooth':
+        period = max(n // 10, 1)
+        return [i % period for i in range(n)]
+    if distribution == 'nearly_sorted':
+        arr = list(range(n))
+        # swap ~1% of the elements
+        for _ in range(max(n // 100, 1)):
+            i, j = rng.randrange(n), rng.randrange(n)
+            arr[i], arr[j] = arr[j], arr[i]
+        return arr
+    raise ValueError("unknown distribution: {!r}".format(distribution))
+
+
+def make_input(distribution, dtype, n, seed=0):
+    rng = random.Random('{}-{}-{}-{}'.format(distribution, dtype, n, seed))
+    arr = ints(distribution, n, rng)
+    if dtype == 'int':
+        return arr
+    if dtype == 'float':
+        return [x + rng.random() / 2 for x in arr]
+    if dtype == 'str':
+        # zero padded, so string order matches the int order
+        return ['{:012d}'.format(x) for x in arr]
+    raise ValueError("unknown dtype: {!r}".format(dtype))
+
+
+'''
+running
+'''
+
+
+def run_case(func, data, repeat, warmup, check=True):
+    expected = sorted(data) if check else None
+    times = []
+    for i in range(warmup + repeat):
+        arr = list(data)
+        start = time.perf_counter()
+        func(arr)
+        elapsed = time.perf_counter() - start
+        if check and arr != expected:
+            raise AssertionError('incorrect result')
+        if i >= warmup:
+            times.append(elapsed)
+    return times
+
+
+def run(sorts, sizes, distributions, dtypes, repeat=5, warmup=1, budget=2.0, out=sys.stdout):
+    results = []
+    print('{:20s} {:14s} {:6s} {:>9s} {:>12s} {:>12s}'.format(
+        'sort', 'distribution', 'dtype', 'n', 'min (s)', 'median (s)'), file=out)
+    for name in sorts:
+        func, supported, max_size = SORTS[name]
+        for distribution in distributions:
+            for dtype in dtypes:
+                if dtype not in supported:
+                    continue
+                too_slow = False
+                for n in sorted(sizes):
+                    if too_slow or (max_size is not None and n > max_size):
+                        status, times = 'skipped', []
+                    else:
+                        data = make_input(distribution, dtype, n)
+                        # one timed run first: if it blows the budget, skip repeats and larger sizes
+                        try:
+                            first = run_case(func, data, 1, 0)
+                            times = first if first[0] > budget else run_case(func, data, repeat, warmup)
+                            status = 'ok'
+                            too_slow = first[0] > budget
+                        except RecursionError:
+                            status, times = 'RecursionError', []
+                            too_slow = True
+                        except Exception as e:
+                            status, times = '{}: {}'.format(type(e).__name__, e), []
+                    result = {'sort': name, 'distribution': distribution, 'dtype': dtype, 'n': n,
+                              'status': status, 'times': times}
+                    if times:
+                        result['min'] = min(times)
+                        result['median'] = statistics.median(times)
+                        result['mean'] = statistics.fmean(times)
+                        print('{:20s} {:14s} {:6s} {:9d} {:12.6f} {:12.6f}'.format(
+                            name, distribution, dtype, n, result['min'], result['median']), file=out)
+                    elif status != 'skipped':
+                        print('{:20s} {:14s} {:6s} {:9d} {}'.format(name, distribution, dtype, n, status), file=out)
+                    results.append(result)
+    return results
+
+
+# parallel_merge_sort at each worker count vs the sequential sorts, on one input of size n
+def scaling(n, worker_counts, distribution='random', dtype='int', repeat=3, out=sys.stdout):
+    data = make_input(distribution, dtype, n)
+    baselines = {name: min(run_case(SORTS[name][0], data, repeat, 0)) for name in SEQUENTIAL_BASELINES}
+    for name, elapsed in baselines.items():
+        print('{:24s} {:12.6f}'.format(name, elapsed), file=out)
+    results = []
+    for workers in worker_counts:
+        elapsed = min(run_case(partial(sort.parallel_merge_sort, workers=workers), data, repeat, 0))
+        result = {'workers': workers, 'n': n, 'min': elapsed,
+                  'speedup': {name: base / elapsed for name, base in baselines.items()}}
+        print('{:24s} {:12.6f}  speedup {}'.format(
+            'parallel_merge_sort x{}'.format(workers), elapsed,
+            ' '.join('{:.2f}x vs {}'.format(x, name) for name, x in result['speedup'].items())), file=out)
+        results.append(result)
+    return {'baselines': baselines, 'results': results}
+
+
+# top k of n elements: nth_element and partial_sort against heapq.nsmallest and a full sort
+def selection(n, ks, distribution='random', dtype='int', repeat=3, out=sys.stdout):
+    data = make_input(distribution, dtype, n)
+    contenders = {
+        'nth_element': lambda arr, k: sort.nth_element(arr, k - 1),
+        'partial_sort': sort.partial_sort,
+        'heapq.nsmallest': lambda arr, k: heapq.nsmallest(k, arr),
+        'sorted()[:k]': lambda arr, k: sorted(arr)[:k],
+        'intro_sort': lambda arr, k: sort.intro_sort(arr),
+    }
+    print('{:>9s} {:>9s} '.format('n', 'k') + ' '.join('{:>16s}'.format(name) for name in contenders), file=out)
+    results = []
+    for k in ks:
+        if not 0 < k <= n:
+            continue
+        times = {name: min(run_case(partial(func, k=k), data, repeat, 0, check=False))
+                 for name, func in contenders.items()}
+        print('{:9d} {:9d} '.format(n, k) + ' '.join('{:16.6f}'.format(times[name]) for name in contenders),
+              file=out)
+        results.append({'n': n, 'k': k, 'times': times})
+    return results
+
+
+'''
+property checks
+'''
+
+
+# orders by key only, so two records with equal keys are equal but still tell apart by id
+@total_ordering
+class Record:
+    __slots__ = ('key', 'id')
+
+    def __init__(self, key, id):
+        self.key, self.id = key, id
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+
+def first(x):
+    return x[0]
+
+
+# negative keys, which the integer sorts only see packed
+def negated_first(x):
+    return -x[0]
+
+
+# every sort on random int keys with many duplicates, compared with sorted():
+# - records (key, -index) with key= and with key= plus reverse=. a sort that compared the records instead
+#   of their keys would put equal keys in reverse input order
+# - plain ints with reverse=
+# - Records without key for the STABLE sorts
+def check(sorts, sizes=(0, 1, 2, 3, 10, 100, 1000), trials=5, seed=0, out=sys.stdout):
+    rng = random.Random(seed)
+    failures = 0
+    for name in sorts:
+        func, _, max_size = SORTS[name]
+        for n in sizes:
+            if max_size is not None and n > max_size:
+                continue
+            for _ in range(trials):
+                keys = [rng.randrange(max(n // 4, 1)) for _ in range(n)]
+                records = [(k, -i) for i, k in enumerate(keys)]
+                cases = [('key', records, {'key': first}),
+                         ('key, reverse', records, {'key': first, 'reverse': True}),
+                         ('reverse', keys, {'reverse': True}),
+                         ('negative key', records, {'key': negated_first}),
+                         ('negative, rev', records, {'key': negated_first, 'reverse': True})]
+                if name in STABLE:
+                    cases.append(('stable', [Record(k, i) for i, k in enumerate(keys)], {}))
+                for label, data, kwargs in cases:
+                    arr = list(data)
+                    try:
+                        func(arr, **kwargs)
+                        expected = sorted(data, **kwargs)
+                        if label == 'stable':
+                            arr, expected = [r.id for r in arr], [r.id for r in expected]
+                        error = None if arr == expected else 'wrong order'
+                    except Exception as e:
+                        error = '{}: {}'.format(type(e).__name__, e)
+                    if error:
+                        failures += 1
+                        print('FAIL {:20s} n={:<6d} {:14s} {}'.format(name, n, label, error), file=out)
+    print('{} failures'.format(failures), file=out)
+    return failures
+
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+    return {'python': sys.version, 'implementation': platform.python_implementation(),
+            'platform': platform.platform(), 'cpus': os.cpu_count(), 'commit': commit,
+            'time': datetime.now(timezone.utc).isoformat()}
+
+
+# key -> median for every ok result, then report cases slower than threshold
+def compare(old, new, threshold=1.10, out=sys.stdout):
+    def key(r):
+        return r['sort'], r['distribution'], r['dtype'], r['n']
+
+    before = {key(r): r['median'] for r in old['results'] if r.get('median')}
+    regressions = 0
+    for r in new['results']:
+        if r.get('median') and key(r) in before:
+            ratio = r['median'] / before[key(r)]
+            if ratio > threshold:
+                regressions += 1
+                print('REGRESSION {:20s} {:14s} {:6s} {:9d} {:.2f}x slower'.format(*key(r), ratio), file=out)
+    print('{} regressions over {:.0%}'.format(regressions, threshold - 1), file=out)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='benchmark the sorts in algorithms/sort.py')
+    parser.add_argument('--sort', nargs='+', default=sorted(SORTS), choices=sorted(SORTS), metavar='NAME',
+                        help='sorts to run (default: all)')
+    parser.add_argument('--sizes', nargs='+', type=lambda x: int(float(x)), default=DEFAULT_SIZES,
+                        help='input sizes, e.g. 1e3 1e4 1e5 1e6 1e7')
+    parser.add_argument('--distributions', nargs='+', default=DISTRIBUTIONS, choices=DISTRIBUTIONS)
+    parser.add_argument('--dtypes', nargs='+', default=DTYPES, choices=DTYPES)
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per case')
+    parser.add_argument('--warmup', type=int, default=1, help='untimed runs per case')
+    parser.add_argument('--budget', type=float, default=2.0,
+                        help='seconds; a run slower than this is not repeated and larger sizes are skipped')
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--compare', help='earlier JSON results to check for regressions')
+    parser.add_argument('--threshold', type=float, default=1.10, help='slowdown ratio reported as regression')
+    parser.add_argument('--scaling', type=lambda x: int(float(x)), metavar='N',
+                        help='instead: time parallel_merge_sort on N elements at each --workers count')
+    parser.add_argument('--workers', nargs='+', type=int, default=None,
+                        help='worker counts for --scaling (default: 1 2 4 ... up to the cpu count)')
+    parser.add_argument('--select', type=lambda x: int(float(x)), metavar='N',
+                        help='instead: time top k selection on N elements for each --k')
+    parser.add_argument('--k', nargs='+', type=lambda x: int(float(x)), default=None,
+                        help='k values for --select (default: 1 10 100 ... up to N)')
+    parser.add_argument('--check', action='store_true', help='instead: property checks of key=, reverse=, stability')
+    args = parser.parse_args(argv)
+
+    if args.check:
+        return 1 if check(args.sort) else 0
+    if args.select:
+        ks = args.k or [10 ** i for i in range(len(str(args.select)))]
+        report = {'meta': metadata(), 'selection': selection(args.select, ks, repeat=args.repeat)}
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(report, f, indent=1)
+        return 0
+    if args.scaling:
+        cpus = os.cpu_count() or 1
+        workers = args.workers or [2 ** i for i in range(cpus.bit_length())] + ([cpus] if cpus & (cpus - 1) else [])
+        report = {'meta': metadata(), 'scaling': scaling(args.scaling, workers, repeat=args.repeat)}
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(report, f, indent=1)
+        return 0
+
+    results = run(args.sort, args.sizes, args.distributions, args.dtypes, args.repeat, args.warmup, args.budget)
+    report = {'meta': metadata(), 'results': results}
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=1)
+    if args.compare:
+        with open(args.compare) as f:
+            return 1 if compare(json.load(f), report, args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -54,3 +54,128 @@ def heap_operations():
     # Merge multiple sorted inputs into a single sorted output
     # e.g. merge timestamped entries from multiple log files
     heapq.merge([1, 3, 5, 7], [0, 2, 4, 8], [5, 10, 15, 20], [], [25])
+
+
+# indexed heap, a min heap that also tracks item -> position, so a queued item's priority can be
+# lowered in place (decrease-key) instead of pushing a duplicate and skipping the stale entry on pop.
+# every item is in the heap at most once, so size stays O(number of distinct items), e.g. O(V) in dijkstra.
+#
+# Time:  O(1) to peek/contains, O(log(n)) to push/pop/decrease_key
+# Space: O(n)
+class IndexedHeap:
+    def __init__(self):
+        self.heap = []  # items, heap-ordered by priority
+        self.priority = {}  # item -> priority
+        self.pos = {}  # item -> index in self.heap
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return item in self.pos
+
+    def peek(self):
+        item = self.heap[0]
+        return item, self.priority[item]
+
+    # insert item, or move it if it is already queued
+    def push(self, item, priority):
+        if item in self.pos:
+            old = self.priority[item]
+            self.priority[item] = priority
+            if priority < old:
+                self._sift_up(self.pos[item])
+            else:
+                self._sift_down(self.pos[item])
+            return
+        self.priority[item] = priority
+        self.pos[item] = len(self.heap)
+        self.heap.append(item)
+        self._sift_up(len(self.heap) - 1)
+
+    def decrease_key(self, item, priority):
+        if priority > self.priority[item]:
+            raise ValueError("new priority is larger than current priority")
+        self.priority[item] = priority
+        self._sift_up(self.pos[item])
+
+    def pop(self):
+        heap = self.heap
+        top, last = heap[0], heap.pop()
+        if heap:
+            heap[0] = last
+            self.pos[last] = 0
+            self._sift_down(0)
+        del self.pos[top]
+        return top, self.priority.pop(top)
+
+    # move item at i towards the root while it is smaller than its parent
+    def _sift_up(self, i):
+        heap, pos, priority = self.heap, self.pos, self.priority
+        item = heap[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if priority[item] >= priority[heap[parent]]:
+                break
+            heap[i] = heap[parent]
+            pos[heap[i]] = i
+            i = parent
+        heap[i] = item
+        pos[item] = i
+
+    # move item at i towards the leaves while a child is smaller
+    def _sift_down(self, i):
+        heap, pos, priority = self.heap, self.pos, self.priority
+        item, n = heap[i], len(heap)
+        while 2 * i + 1 < n:
+            child = 2 * i + 1
+            # choose the smaller child
+            if child + 1 < n and priority[heap[child + 1]] < priority[heap[child]]:
+                child += 1
+            if priority[heap[child]] >= priority[item]:
+                break
+            heap[i] = heap[child]
+            pos[heap[i]] = i
+            i = child
+        heap[i] = item
+        pos[item] = i
+
+
+# radix heap, a monotone priority queue for non-negative int keys: a popped key is never larger than
+# a later pushed one (true for dijkstra). bucket i holds keys whose highest bit differing from the last
+# popped key is bit i - 1, bucket 0 holds keys equal to it. pop empties the first non-empty bucket into
+# lower ones, so every key moves down at most log(C) times, C is the max key.
+#
+# Time:  O(1) to push, amortized O(log(C)) to pop
+# Space: O(n + log(C))
+class RadixHeap:
+    def __init__(self):
+        self.buckets = [[]]
+        self.last = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, key, item):
+        if key < self.last:
+            raise ValueError("radix heap is monotone, key {} < last popped {}".format(key, self.last))
+        i = (key ^ self.last).bit_length()
+        while len(self.buckets) <= i:
+            self.buckets.append([])
+        self.buckets[i].append((key, item))
+        self.size += 1
+
+    def pop(self):
+        buckets = self.buckets
+        if not buckets[0]:
+            i = 1
+            while not buckets[i]:
+                i += 1
+            # redistribute the first non-empty bucket around its min key
+            bucket, buckets[i] = buckets[i], []
+            self.last = min(key for key, _ in bucket)
+            for key, item in bucket:
+                buckets[(key ^ self.last).bit_length()].append((key, item))
+        self.size -= 1
+        return buckets[0].pop()